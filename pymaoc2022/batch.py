@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""Solve many puzzle inputs in parallel, without rendering, as JSON."""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from pymaoc2022.cache import ResultCache, input_digest
+from pymaoc2022.records import mapped_input
+
+DAYS = ("day01", "day02", "day03", "day04")
+TASK_SEP = "="
+# Malformed inputs also fail the assertions and the lookups of some solvers
+TASK_ERRORS = (OSError, ValueError, IndexError, KeyError, AssertionError)
+
+
+def parse_task(task: str) -> tuple[str, Path]:
+    """
+    Parse a task description.
+
+    Args:
+        task: `DAY=PATH` where DAY is one of `DAYS`
+
+    Returns:
+        the day and the puzzle input path
+
+    Raises:
+        ValueError: if the task is malformed or the day unknown
+    """
+    day, sep, path = task.partition(TASK_SEP)
+    if not sep or not path:
+        raise ValueError(f"Task must be of the form DAY{TASK_SEP}PATH: {task}")
+
+    if day not in DAYS:
+        raise ValueError(f"Unknown day {day}, expected one of {DAYS}")
+
+    return day, Path(path)
+
+
+def run_task(day: str, path: Path, cache: ResultCache | None = None) -> dict:
+    """
+    Solve all the parts of a day for one puzzle input.
+
+    Errors are reported in the result instead of being raised, so that one bad input
+    does not stop a whole batch.
+
+    Args:
+        day: one of `DAYS`
+        path: puzzle input file
+        cache: cache returning the answers of known inputs without parsing them, no
+            caching if omitted
+
+    Returns:
+        JSON-friendly result with the answer of each part, the time spent and the
+        cache hits and misses
+    """
+    module = importlib.import_module(f"pymaoc2022.{day}")
+    cache = cache or ResultCache(Path(), enabled=False)
+    hits, misses = cache.hits, cache.misses
+    result = {"day": day, "input": str(path), "answers": {}, "error": None}
+
+    start = perf_counter()
+    try:
+        # The map stays open while solving, the solvers scan it in place
+        with mapped_input(path) as puzzle_input:
+            answers = cache.answers(
+                module.solve,
+                input_digest(puzzle_input),
+                module.PARTS,
+                lambda: [module.solve(puzzle_input, part) for part in module.PARTS],
+            )
+        for part, answer in zip(module.PARTS, answers, strict=True):
+            result["answers"][f"part{part}"] = answer
+    except TASK_ERRORS as err:
+        result["error"] = f"{type(err).__name__}: {err}"
+    result["seconds"] = perf_counter() - start
+    result["cache"] = {"hits": cache.hits - hits, "misses": cache.misses - misses}
+
+    return result
+
+
+def _run_task(task: tuple[str, Path, ResultCache | None]) -> dict:
+    return run_task(*task)
+
+
+def run_batch(
+    tasks: Iterable[tuple[str, Path]],
+    workers: int | None = None,
+    cache: ResultCache | None = None,
+) -> dict:
+    """
+    Solve many puzzle inputs across a pool of processes.
+
+    Args:
+        tasks: day and puzzle input path of each task
+        workers: number of processes, defaults to the number of CPUs, 1 runs all the
+            tasks in the current process
+        cache: cache shared by all the processes, no caching if omitted
+
+    Returns:
+        JSON-friendly results of all the tasks, in order, with the total time spent
+        and cache hits and misses
+    """
+    tasks = [(day, path, cache) for day, path in tasks]
+    workers = workers or os.cpu_count() or 1
+
+    start = perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        results = [_run_task(task) for task in tasks]
+    else:
+        # Big chunks amortize the inter-process overhead on thousands of small inputs
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks, chunksize=chunksize))
+
+    return {
+        "tasks": results,
+        "workers": workers,
+        "seconds": perf_counter() - start,
+        "cache": {
+            counter: sum(result["cache"][counter] for result in results)
+            for counter in ("hits", "misses")
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Solve puzzle inputs from the command line.
+
+    Args:
+        argv: command line arguments, defaults to `sys.argv`
+
+    Returns:
+        exit status, 1 if a task failed
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("tasks", nargs="*", help=f"tasks of the form DAY{TASK_SEP}PATH")
+    parser.add_argument(
+        "--days",
+        nargs="+",
+        choices=DAYS,
+        help="days to solve on their own puzzle input",
+    )
+    parser.add_argument(
+        "--manifest", type=Path, help=f"file with one DAY{TASK_SEP}PATH task per line"
+    )
+    parser.add_argument("--workers", type=int, help="number of processes")
+    parser.add_argument("--output", type=Path, help="JSON file, stdout if omitted")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="solve even the already known inputs"
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="forget all the cached answers"
+    )
+    args = parser.parse_args(argv)
+
+    descriptions = list(args.tasks)
+    if args.manifest:
+        descriptions += args.manifest.read_text().split()
+
+    try:
+        tasks = [parse_task(task) for task in descriptions]
+    except ValueError as err:
+        parser.error(str(err))
+
+    days = args.days or ([] if tasks else DAYS)
+    tasks += [
+        (day, importlib.import_module(f"pymaoc2022.{day}").DATA_FILE) for day in days
+    ]
+
+    cache = ResultCache.default()
+    if args.clear_cache:
+        cache.clear()
+    if args.no_cache:
+        cache.enabled = False
+
+    results = run_batch(tasks, args.workers, cache)
+    report = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+    return 1 if any(result["error"] for result in results["tasks"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+"""Benchmark the solvers on synthetic inputs of growing size."""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from time import perf_counter
+from typing import NamedTuple
+
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.generators import DEFAULT_SEED, generate_text
+
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+DEFAULT_TOLERANCE = 0.2  # accepted throughput loss before reporting a regression
+DAY_MODULES = (
+    "pymaoc2022.day01",
+    "pymaoc2022.day02",
+    "pymaoc2022.day03",
+    "pymaoc2022.day04",
+)
+HEAVY_MODULES = ("rich", "more_itertools", "numpy")  # must not load with the solvers
+DEFAULT_IMPORT_BUDGET = 0.05  # seconds to import one day module in a fresh process
+IMPORT_TIME_PREFIX = "import time:"
+
+
+class BenchResult(NamedTuple):
+    """Measure of one solver on one input size."""
+
+    solver: str
+    size: int  # number of records
+    seconds: float
+    records_per_s: float
+    peak_memory: int  # bytes allocated at the peak, input excluded
+
+
+SOLVERS: dict[str, tuple[str, Callable]] = {
+    "most_calorie_elves": ("day01", day01.most_calorie_elves),
+    "compute_global_score": ("day02", day02.compute_global_score),
+    "compute_total_priorities": ("day03", day03.compute_total_priorities),
+    "nb_overlap": ("day04", day04.nb_overlap),
+}
+
+
+class ImportResult(NamedTuple):
+    """Measure of the import of one module in a fresh interpreter."""
+
+    module: str
+    seconds: float  # cumulative, dependencies included
+    heavy: list[str]  # `HEAVY_MODULES` packages loaded along the way
+
+
+def parse_import_times(stderr: str) -> dict[str, int]:
+    """
+    Read the cumulative import times reported by `python -X importtime`.
+
+    Only the lines starting with `IMPORT_TIME_PREFIX` are timings, the header row and
+    any other output, like a warning, are skipped.
+
+    Args:
+        stderr: error output of the interpreter
+
+    Returns:
+        the cumulative import time of each module, in microseconds
+    """
+    # Lines look like `import time:  self [us] | cumulative | imported package`
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        fields = line.removeprefix(IMPORT_TIME_PREFIX).split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            cumulative[fields[2].strip()] = int(fields[1])
+    return cumulative
+
+
+def bench_import(module: str) -> ImportResult:
+    """
+    Measure the import time of a module with `python -X importtime`.
+
+    Args:
+        module: dotted name of the module to import
+
+    Returns:
+        the measure of the import
+
+    Raises:
+        ValueError: if the module fails to import
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if process.returncode:
+        raise ValueError(f"Cannot import {module}: {process.stderr.strip()}")
+
+    cumulative = parse_import_times(process.stderr)
+    return ImportResult(
+        module=module,
+        seconds=cumulative[module] / 1e6,
+        heavy=[
+            package
+            for package in HEAVY_MODULES
+            if any(name.partition(".")[0] == package for name in cumulative)
+        ],
+    )
+
+
+def bench_solver(solver: str, size: int, seed: int = DEFAULT_SEED) -> BenchResult:
+    """
+    Measure the throughput and the peak memory of a solver.
+
+    The solver runs twice on the same input: once to measure its duration, then once
+    under `tracemalloc` to measure its peak memory without slowing down the timing.
+
+    Args:
+        solver: name of the solver, one of `SOLVERS`
+        size: number of records of the synthetic input
+        seed: seed of the synthetic input
+
+    Returns:
+        the measure of the solver
+    """
+    day, solve = SOLVERS[solver]
+    puzzle_input = generate_text(day, size, seed)
+
+    start = perf_counter()
+    solve(puzzle_input)
+    seconds = perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        solve(puzzle_input)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        solver=solver,
+        size=size,
+        seconds=seconds,
+        records_per_s=size / seconds if seconds else float("inf"),
+        peak_memory=peak_memory,
+    )
+
+
+def run(
+    solvers: Iterable[str] = SOLVERS,
+    sizes: Iterable[int] = SIZES,
+    seed: int = DEFAULT_SEED,
+) -> list[BenchResult]:
+    """
+    Benchmark solvers on all the input sizes.
+
+    Args:
+        solvers: names of the solvers to benchmark
+        sizes: number of records of the synthetic inputs
+        seed: seed of the synthetic inputs
+
+    Returns:
+        the measure of each solver on each input size
+    """
+    return [bench_solver(solver, size, seed) for solver in solvers for size in sizes]
+
+
+def save(results: Iterable[BenchResult], path: Path):
+    """
+    Save benchmark results as a JSON baseline.
+
+    Args:
+        results: measures to save
+        path: JSON file to write
+    """
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [result._asdict() for result in results],
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def load(path: Path) -> list[BenchResult]:
+    """
+    Load benchmark results from a JSON baseline.
+
+    Args:
+        path: JSON file to read
+
+    Returns:
+        the measures of the baseline
+    """
+    baseline = json.loads(path.read_text())
+    return [BenchResult(**result) for result in baseline["results"]]
+
+
+def regressions(
+    baseline: Iterable[BenchResult],
+    current: Iterable[BenchResult],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[tuple[BenchResult, BenchResult]]:
+    """
+    Find the measures whose throughput dropped beyond the tolerance.
+
+    Measures are matched by solver and size, unmatched ones are ignored.
+
+    Args:
+        baseline: reference measures
+        current: new measures
+        tolerance: accepted relative throughput loss, 0.2 means 20%
+
+    Returns:
+        the baseline and current measure of each regression
+    """
+    reference = {(result.solver, result.size): result for result in baseline}
+    return [
+        (reference[result.solver, result.size], result)
+        for result in current
+        if (result.solver, result.size) in reference
+        and result.records_per_s
+        < reference[result.solver, result.size].records_per_s * (1 - tolerance)
+    ]
+
+
+def _print_results(results: Iterable[BenchResult]):
+    print(f"{'solver':<26}{'records':>10}{'records/s':>14}{'peak memory':>14}")
+    for result in results:
+        print(
+            f"{result.solver:<26}{result.size:>10}"
+            f"{result.records_per_s:>14.0f}{result.peak_memory:>14}"
+        )
+
+
+def _check_imports(modules: Iterable[str], budget: float) -> int:
+    status = 0
+    print(f"{'module':<26}{'import time':>14}")
+    for result in map(bench_import, modules):
+        print(f"{result.module:<26}{result.seconds * 1000:>12.1f}ms")
+        if result.heavy:
+            print(f"REGRESSION {result.module} imports {result.heavy}", file=sys.stderr)
+            status = 1
+        if result.seconds > budget:
+            print(
+                f"REGRESSION {result.module} takes {result.seconds:.3f}s to import, "
+                f"more than {budget:.3f}s",
+                file=sys.stderr,
+            )
+            status = 1
+    return status
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run or compare benchmarks from the command line.
+
+    Args:
+        argv: command line arguments, defaults to `sys.argv`
+
+    Returns:
+        exit status, 1 if a regression is found
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="benchmark the solvers")
+    run_cmd.add_argument("--output", type=Path, help="JSON file to save results to")
+
+    compare_cmd = commands.add_parser(
+        "compare", help="benchmark the solvers and fail on throughput regressions"
+    )
+    compare_cmd.add_argument("baseline", type=Path, help="JSON baseline file")
+    compare_cmd.add_argument(
+        "current", type=Path, nargs="?", help="JSON results, benchmark if omitted"
+    )
+    compare_cmd.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    for cmd in (run_cmd, compare_cmd):
+        cmd.add_argument("--solvers", nargs="+", choices=SOLVERS, default=None)
+        cmd.add_argument("--sizes", nargs="+", type=int, default=None)
+        cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    imports_cmd = commands.add_parser(
+        "imports", help="fail if the solvers are slow to import or load UI packages"
+    )
+    imports_cmd.add_argument("--modules", nargs="+", default=DAY_MODULES)
+    imports_cmd.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET,
+        help="maximum import time of each module, in seconds",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        return _check_imports(args.modules, args.budget)
+
+    if args.command == "run":
+        results = run(args.solvers or SOLVERS, args.sizes or SIZES, args.seed)
+        _print_results(results)
+        if args.output:
+            save(results, args.output)
+        return 0
+
+    baseline = load(args.baseline)
+    if args.current:
+        current = load(args.current)
+    else:
+        solvers = args.solvers or list(dict.fromkeys(r.solver for r in baseline))
+        sizes = args.sizes or list(dict.fromkeys(r.size for r in baseline))
+        current = run(solvers, sizes, args.seed)
+    _print_results(current)
+
+    found = regressions(baseline, current, args.tolerance)
+    for before, after in found:
+        print(
+            f"REGRESSION {after.solver} at {after.size} records: "
+            f"{before.records_per_s:.0f} -> {after.records_per_s:.0f} records/s",
+            file=sys.stderr,
+        )
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Cache the answers of the solvers on disk, keyed by the content of their input."""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Self
+
+from pymaoc2022.records import Buffer
+from pymaoc2022.validation import get_validation_mode
+
+CACHE_VERSION = 1  # bump when the format of the cached answers changes
+DEFAULT_MAX_BYTES = 64 << 20
+
+ENV_VAR = "PYMAOC_CACHE"  # "off" bypasses the cache
+DIR_ENV_VAR = "PYMAOC_CACHE_DIR"
+SUFFIX = ".json"
+
+
+def input_digest(puzzle_input: Buffer | os.PathLike) -> str:
+    """
+    Hash the content of a puzzle input.
+
+    Args:
+        puzzle_input: content of the puzzle input, like a `mapped_input`, or path of a
+            file streamed from disk
+
+    Returns:
+        the hexadecimal SHA-256 of the content
+    """
+    if isinstance(puzzle_input, os.PathLike):
+        with open(puzzle_input, "rb") as input_f:
+            return hashlib.file_digest(input_f, "sha256").hexdigest()
+
+    return hashlib.sha256(puzzle_input).hexdigest()
+
+
+def _solver_name(solver: Callable) -> str:
+    """Name a solver the same way whether its module runs as a script or not."""
+    module = sys.modules.get(solver.__module__)
+    module_name = getattr(getattr(module, "__spec__", None), "name", solver.__module__)
+    return f"{module_name}.{solver.__qualname__}"
+
+
+def default_directory() -> Path:
+    """
+    Find the cache directory from the environment.
+
+    Returns:
+        `$PYMAOC_CACHE_DIR`, or `pymaoc2022` in the user cache directory
+    """
+    if directory := os.environ.get(DIR_ENV_VAR):
+        return Path(directory)
+
+    user_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(user_cache) / "pymaoc2022"
+
+
+@dataclass
+class ResultCache:
+    """
+    Answers stored as one JSON file per key, evicted least recently used first.
+
+    Entries are written to a temporary file then renamed, so several processes can
+    share the same directory. Answers read back from the cache are JSON values: tuples
+    come back as lists.
+
+    The directory is only scanned for eviction when the estimated size of its entries
+    goes beyond `max_bytes`, the estimate being reset by each scan.
+    """
+
+    directory: Path
+    max_bytes: int = DEFAULT_MAX_BYTES
+    enabled: bool = True
+    hits: int = 0
+    misses: int = 0
+    # Size of the entries at the last scan plus the size written since, None if the
+    # directory was never scanned
+    _size: int | None = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def default(cls: type[Self]) -> Self:
+        """
+        Create the cache configured by the environment.
+
+        Returns:
+            the cache in `default_directory()`, disabled if `$PYMAOC_CACHE` is "off"
+        """
+        return cls(default_directory(), enabled=os.environ.get(ENV_VAR) != "off")
+
+    def key(self: Self, digest: str, solver: Callable, part: int) -> str:
+        """
+        Compute the key of the answer of a solver.
+
+        The current validation mode is part of the key: an answer computed without
+        checking each record is never served to a strict run, which may reject the
+        same input.
+
+        Args:
+            digest: `input_digest` of the puzzle input
+            solver: function computing the answer
+            part: part of the puzzle answered
+
+        Returns:
+            the hexadecimal key
+        """
+        mode = get_validation_mode()
+        identity = f"{CACHE_VERSION}:{digest}:{_solver_name(solver)}:{part}:{mode}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _path(self: Self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self: Self, key: str) -> tuple[bool, Any]:
+        """
+        Read an answer.
+
+        Args:
+            key: key of the answer
+
+        Returns:
+            whether the answer was found, and the answer
+        """
+        if self.enabled:
+            path = self._path(key)
+            try:
+                answer = json.loads(path.read_text())
+                os.utime(path)  # recently used entries are evicted last
+            except (OSError, ValueError):
+                pass
+            else:
+                self.hits += 1
+                return True, answer
+
+        self.misses += 1
+        return False, None
+
+    def put(self: Self, key: str, answer: Any):  # noqa: ANN401
+        """
+        Store an answer, then evict the least recently used ones beyond `max_bytes`.
+
+        Args:
+            key: key of the answer
+            answer: JSON serializable answer
+        """
+        if not self.enabled:
+            return
+
+        data = json.dumps(answer)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_f = tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False
+        )
+        try:
+            with tmp_f:
+                tmp_f.write(data)
+            os.replace(tmp_f.name, self._path(key))
+        except BaseException:
+            # A failed write must not leave a partial temporary file behind
+            Path(tmp_f.name).unlink(missing_ok=True)
+            raise
+
+        # Replacing an entry over-estimates the size, which only scans earlier
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self: Self):
+        entries = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def answers(
+        self: Self,
+        solver: Callable,
+        digest: str,
+        parts: Iterable[int],
+        compute: Callable[[], Sequence],
+    ) -> list:
+        """
+        Get the answer of all the parts, computing them all at once on a miss.
+
+        Args:
+            solver: `solve` function of the day, identifying the answers
+            digest: `input_digest` of the puzzle input
+            parts: parts to answer
+            compute: computes the answer of each part, in the same order, on a miss
+
+        Returns:
+            the answer of each part
+        """
+        keys = [self.key(digest, solver, part) for part in parts]
+        cached = []
+        for key in keys:
+            found, answer = self.get(key)
+            if not found:
+                break
+            cached.append(answer)
+        else:
+            return cached
+
+        answers = list(compute())
+        for key, answer in zip(keys, answers, strict=True):
+            self.put(key, answer)
+        return answers
+
+    def discard(self: Self, key: str) -> bool:
+        """
+        Invalidate one answer.
+
+        Args:
+            key: key of the answer
+
+        Returns:
+            True if the answer was cached
+        """
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self: Self):
+        """Invalidate all the answers."""
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+    def stats(self: Self) -> dict[str, int]:
+        """
+        Count the lookups for monitoring.
+
+        Returns:
+            the number of hits and misses since the cache was created
+        """
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+"""Solve append-only puzzle inputs incrementally, resuming from a checkpoint."""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Self
+
+from pymaoc2022.cache import default_directory
+from pymaoc2022.records import Buffer, mapped_input
+from pymaoc2022.sharding import (
+    REDUCTIONS,
+    count_records,
+    part_answers,
+    record_start,
+    reduce_shards,
+    shard_partial,
+)
+
+CHECKPOINT_VERSION = 3  # bump when the format of the checkpoints changes
+BLOCK_SIZE = 1 << 12  # bytes of each block sampled in the covered part of an input
+NB_BLOCKS = 16  # blocks sampled, evenly spread from the start to the offset
+
+
+def sampled_digest(buffer: Buffer, offset: int) -> str:
+    """
+    Fingerprint the part of a puzzle input that a checkpoint covers.
+
+    Only `NB_BLOCKS` blocks are hashed, the first and the last ones included, so that
+    resuming costs the same whatever the size of the part already solved. A covered
+    part smaller than all these blocks is hashed whole.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        offset: end of the covered part
+
+    Returns:
+        the hexadecimal SHA-256 of the sampled blocks of the input up to `offset`
+    """
+    if offset <= NB_BLOCKS * BLOCK_SIZE:
+        return hashlib.sha256(buffer[:offset]).hexdigest()
+
+    digest = hashlib.sha256()
+    for idx in range(NB_BLOCKS):
+        start = (offset - BLOCK_SIZE) * idx // (NB_BLOCKS - 1)
+        digest.update(buffer[start : start + BLOCK_SIZE])
+    return digest.hexdigest()
+
+
+def file_identity(path: str | os.PathLike) -> tuple[int, int]:
+    """
+    Identify a file, whatever its path, to notice that it was replaced.
+
+    Args:
+        path: puzzle input file
+
+    Returns:
+        the device and the inode number of the file
+    """
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino
+
+
+def complete_stop(buffer: Buffer, day: str, start: int = 0) -> int:
+    """
+    Find the end of the last whole unit of records, that an append can not change.
+
+    The last record is only complete once its separator is written, and a day 3
+    group once its third rucksack is.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        day: one of `REDUCTIONS`
+        start: start of a unit of records, where the search starts
+
+    Returns:
+        the end of the last whole unit after `start`, `start` if there is none
+    """
+    reduction = REDUCTIONS[day]
+    sep = reduction.sep
+    extra = 0
+    if reduction.group > 1:
+        extra = count_records(buffer, sep, start, len(buffer)) % reduction.group
+
+    found = len(buffer)
+    for _ in range(extra + 1):
+        found = buffer.rfind(sep, start, found)
+        if found == -1:
+            return start
+
+    if reduction.group > 1:
+        return found + len(sep)
+    return max(start, record_start(buffer, sep, found + len(sep)))
+
+
+def default_checkpoint(day: str, path: str | os.PathLike) -> Path:
+    """
+    Locate the checkpoint of a puzzle input in the cache directory.
+
+    Args:
+        day: one of `REDUCTIONS`
+        path: puzzle input file
+
+    Returns:
+        a checkpoint file named after the day and the absolute path of the input
+    """
+    identity = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()
+    return default_directory() / "checkpoints" / f"{day}-{identity[:16]}.json"
+
+
+@dataclass
+class Checkpoint:
+    """
+    Partial result of the start of a puzzle input, up to the end of a whole unit.
+
+    The incomplete unit at the end of the input, like a day 1 Elf or a day 3 group
+    still being written, is not part of the result: it is read again from `offset`
+    by the next run, since an append may still extend its last record.
+    """
+
+    day: str
+    offset: int  # end of the last whole unit solved
+    device: int  # device of the input file
+    inode: int  # inode number of the input file
+    digest: str  # digest of the blocks sampled in the input up to offset
+    result: Any  # partial result up to offset, in its JSON form
+    version: int = CHECKPOINT_VERSION
+
+    @classmethod
+    def create(
+        cls: type[Self],
+        day: str,
+        path: str | os.PathLike,
+        buffer: Buffer,
+        offset: int,
+        result: Any,  # noqa: ANN401
+    ) -> Self:
+        """
+        Checkpoint the partial result of the start of a puzzle input.
+
+        Args:
+            day: one of `REDUCTIONS`
+            path: puzzle input file
+            buffer: puzzle input read from `path`, like a `mapped_input`
+            offset: end of the last whole unit solved
+            result: partial result up to `offset`
+
+        Returns:
+            the checkpoint
+        """
+        device, inode = file_identity(path)
+        return cls(day, offset, device, inode, sampled_digest(buffer, offset), result)
+
+    @classmethod
+    def load(cls: type[Self], path: Path) -> Self | None:
+        """
+        Read a checkpoint.
+
+        Args:
+            path: JSON file written by `save`
+
+        Returns:
+            the checkpoint, None if it is missing, unreadable or from another version
+        """
+        try:
+            checkpoint = cls(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        return checkpoint if checkpoint.version == CHECKPOINT_VERSION else None
+
+    def save(self: Self, path: Path):
+        """
+        Write the checkpoint, atomically replacing the previous one.
+
+        Args:
+            path: JSON file to write
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".tmp", delete=False
+        ) as tmp_f:
+            json.dump(asdict(self), tmp_f)
+        os.replace(tmp_f.name, path)
+
+    def matches(self: Self, day: str, path: str | os.PathLike, buffer: Buffer) -> bool:
+        """
+        Check that a puzzle input only grew since the checkpoint was taken.
+
+        A truncated input is shorter than the offset, a replaced one is another file
+        and a rewritten one has different sampled blocks. The input is meant to be
+        append-only: an edit of the same file in place, between the sampled blocks of a
+        large input, is not noticed.
+
+        Args:
+            day: one of `REDUCTIONS`
+            path: puzzle input file
+            buffer: puzzle input read from `path`, like a `mapped_input`
+
+        Returns:
+            True if the checkpoint can be resumed on this input
+        """
+        return (
+            self.day == day
+            and self.offset <= len(buffer)
+            and file_identity(path) == (self.device, self.inode)
+            and sampled_digest(buffer, self.offset) == self.digest
+        )
+
+
+def solve_incremental(
+    day: str,
+    path: str | os.PathLike,
+    checkpoint: Path | None = None,
+    workers: int | None = 1,
+    shard_size: int | None = None,
+) -> dict:
+    """
+    Solve all the parts of a day, only reading what was appended since the last run.
+
+    The input is solved from its checkpoint, or from scratch if it was truncated or
+    rewritten, then the checkpoint is moved to the end of its last whole unit.
+
+    Args:
+        day: one of `REDUCTIONS`
+        path: puzzle input file
+        checkpoint: checkpoint file, defaults to `default_checkpoint`
+        workers: number of processes solving the new records, None for the number of
+            CPUs
+        shard_size: approximate size of a shard of new records in bytes
+
+    Returns:
+        the answer of each part, as returned by `solve`, where the run resumed and
+        where the checkpoint now is, and the time spent
+
+    Raises:
+        ValueError: if the day is unknown or the puzzle input is invalid
+    """
+    if day not in REDUCTIONS:
+        raise ValueError(f"Unknown day {day}, expected one of {tuple(REDUCTIONS)}")
+
+    reduction = REDUCTIONS[day]
+    checkpoint = checkpoint or default_checkpoint(day, path)
+
+    start = perf_counter()
+    with mapped_input(path) as buffer:
+        previous = Checkpoint.load(checkpoint)
+        if previous and previous.matches(day, path, buffer):
+            offset, result = previous.offset, reduction.restore(previous.result)
+        else:
+            offset, result = 0, reduction.empty
+
+        stop = complete_stop(buffer, day, offset)
+        if stop > offset:
+            solved, _ = reduce_shards(day, path, offset, stop, workers, shard_size)
+            result = reduction.combine(result, solved)
+        Checkpoint.create(day, path, buffer, stop, result).save(checkpoint)
+
+        # The incomplete unit is solved for this run only
+        result = reduction.combine(
+            result, shard_partial(day, buffer, stop, len(buffer))
+        )
+
+    return {
+        "day": day,
+        "input": str(path),
+        "answers": part_answers(day, result),
+        "resumed": offset,
+        "checkpoint": stop,
+        "seconds": perf_counter() - start,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Solve an append-only puzzle input from the command line.
+
+    Args:
+        argv: command line arguments, defaults to `sys.argv`
+
+    Returns:
+        exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("day", choices=REDUCTIONS, help="puzzle format")
+    parser.add_argument("input", type=Path, help="puzzle input file")
+    parser.add_argument("--checkpoint", type=Path, help="checkpoint file")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes")
+    parser.add_argument(
+        "--reset", action="store_true", help="forget the checkpoint and start over"
+    )
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or default_checkpoint(args.day, args.input)
+    if args.reset:
+        checkpoint.unlink(missing_ok=True)
+
+    result = solve_incremental(args.day, args.input, checkpoint, args.workers)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,30 @@
 #!/usr/bin/env python
 """Solution to day 1 challenge."""
 
+import heapq
+import math
+import os
+import warnings
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple, Self
 
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.table import Table
+from pymaoc2022.instrumentation import stage
+from pymaoc2022.records import (
+    BUFFER_TYPES,
+    Buffer,
+    content_stop,
+    iter_buffer_records,
+    iter_lines,
+    mapped_input,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 ELF_SEP = "\n\n"
 SNACK_SEP = "\n"
@@ -14,6 +32,8 @@ RANK = ["🥇", "🥈", "🥉"]
 
 BASE_DIRE = Path(__file__).parent
 INSTRUCTIONS = BASE_DIRE / "instructions"
+DATA_FILE = BASE_DIRE / "calories_list.data"
+PARTS = (1, 2)
 
 
 class ElfPackage(NamedTuple):
@@ -23,55 +43,440 @@ class ElfPackage(NamedTuple):
     cal: int  # calories
 
 
-def most_calorie_elf(calorie_list: str) -> ElfPackage:
+@dataclass(frozen=True)
+class CalorieIndex:
+    """
+    Precomputed ranking of all the Elves to answer many questions about them.
+
+    Totals, ranking and ranks are stored in compact `array('q')` so that each query
+    is O(1) or O(log n) without rebuilding anything. Ties are broken by elf index,
+    exactly like `most_calorie_elves`.
+    """
+
+    totals: array  # calories carried, by elf index - 1
+    ranking: array  # elf indexes from the most to the least calories
+    ranks: array  # rank (starting at 1), by elf index - 1
+
+    @classmethod
+    def from_calories(cls: type[Self], calories: Iterable[int]) -> Self:
+        """
+        Build the index from the total calories of each Elf.
+
+        Args:
+            calories: total calories of each Elf, in order
+
+        Returns:
+            the index of all the Elves
+        """
+        totals = array("q", calories)
+        ranking = array(
+            "q",
+            sorted(
+                range(1, len(totals) + 1), key=lambda elf: totals[elf - 1], reverse=True
+            ),
+        )
+        ranks = array("q", bytes(ranking.itemsize * len(ranking)))
+        for rank, elf in enumerate(ranking, start=1):
+            ranks[elf - 1] = rank
+
+        return cls(totals, ranking, ranks)
+
+    @classmethod
+    def from_str(cls: type[Self], calorie_list: str) -> Self:
+        """
+        Build the index from a calorie list.
+
+        Args:
+            calorie_list: This list represents the Calories of the food carried by all
+                Elves
+
+        Returns:
+            the index of all the Elves
+        """
+        return cls.from_calories(iter_elf_calories(calorie_list.split(SNACK_SEP)))
+
+    def __len__(self: Self) -> int:
+        """Number of Elves in the index."""
+        return len(self.totals)
+
+    def _check_elf(self: Self, elf: int):
+        if not 1 <= elf <= len(self):
+            raise ValueError(f"Unknown elf n°{elf}, there are {len(self)} elves")
+
+    def calories(self: Self, elf: int) -> int:
+        """
+        Get the calories carried by an Elf.
+
+        Args:
+            elf: index of the Elf (starting at 1)
+
+        Returns:
+            the total calories carried by this Elf
+
+        Raises:
+            ValueError: if the Elf is not in the index
+        """
+        self._check_elf(elf)
+        return self.totals[elf - 1]
+
+    def rank(self: Self, elf: int) -> int:
+        """
+        Get the rank of an Elf, 1 being the Elf carrying the most calories.
+
+        Args:
+            elf: index of the Elf (starting at 1)
+
+        Returns:
+            the rank of this Elf
+
+        Raises:
+            ValueError: if the Elf is not in the index
+        """
+        self._check_elf(elf)
+        return self.ranks[elf - 1]
+
+    def top(self: Self, n: int = 3) -> list[ElfPackage]:
+        """
+        Get the `n` Elves carrying the most calories.
+
+        Args:
+            n: number of Elves to get
+
+        Returns:
+            list of Elf package of the `n` elves carrying the most calories
+        """
+        return [
+            ElfPackage(elf=elf, cal=self.totals[elf - 1]) for elf in self.ranking[:n]
+        ]
+
+    def percentile(self: Self, percent: float) -> int:
+        """
+        Get the calories at a given percentile, using the nearest-rank method.
+
+        Args:
+            percent: percentile between 0 and 100
+
+        Returns:
+            the smallest calories such that `percent`% of the Elves carry at most that
+
+        Raises:
+            ValueError: if the percentile is out of range or the index is empty
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError(f"Percentile must be between 0 and 100: {percent}")
+
+        if not self.ranking:
+            raise ValueError("No percentile in an empty index")
+
+        nb_below = max(1, math.ceil(percent / 100 * len(self)))
+        return self.totals[self.ranking[len(self) - nb_below] - 1]
+
+    def count_above(self: Self, threshold: int) -> int:
+        """
+        Count the Elves carrying strictly more calories than a threshold.
+
+        Args:
+            threshold: calories to compare with
+
+        Returns:
+            number of Elves carrying more than `threshold` calories
+        """
+        return bisect_left(
+            self.ranking, -threshold, key=lambda elf: -self.totals[elf - 1]
+        )
+
+
+def _snack_lines(calorie_list: str | Buffer | Iterable[str]) -> Iterable[str | bytes]:
+    """Split a calorie list in lines, unless it is already an iterable of lines."""
+    if isinstance(calorie_list, str):
+        return calorie_list.split(SNACK_SEP)
+    if isinstance(calorie_list, BUFFER_TYPES):
+        return iter_buffer_records(calorie_list, SNACK_SEP)
+    return iter_lines(calorie_list)
+
+
+def _calorie_text(calorie_list: str | Buffer | Iterable[str]) -> str | bytes:
+    """Join the lines of a calorie list, for the engines needing a buffer."""
+    if isinstance(calorie_list, str | bytes):
+        return calorie_list
+    if isinstance(calorie_list, BUFFER_TYPES):
+        # `np.fromstring` only parses bytes objects
+        return bytes(calorie_list)
+    return SNACK_SEP.join(iter_lines(calorie_list))
+
+
+def most_calorie_elf(
+    calorie_list: str | Buffer | Iterable[str], backend: str = "python"
+) -> ElfPackage:
     """
     Answer the day 1 part 1 challenge question.
 
     Args:
-        calorie_list: This list represents the Calories of the food carried by all Elves
+        calorie_list: This list represents the Calories of the food carried by all
+            Elves, as text or as a buffer like `mapped_input(path)`, or an iterable of
+            lines like a file object or `iter_records(path)`
+        backend: "python" for the pure Python engine, "numpy" for the vectorized one
 
     Returns:
         Elf package of the elf carrying the most calories
-    """
-    return most_calorie_elves(calorie_list)[0]
 
-
-def most_calorie_elves(calorie_list: str) -> list[ElfPackage]:
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    match backend:
+        case "python":
+            return top_calorie_elves(_snack_lines(calorie_list), n=1)[0]
+        case "numpy":
+            totals = elf_calories_array(_calorie_text(calorie_list))
+            return top_elves_array(totals, n=1)[0]
+        case _:
+            raise ValueError(f"Unknown backend: {backend}")
+
+
+def most_calorie_elves(
+    calorie_list: str | Buffer | Iterable[str], backend: str = "python"
+) -> list[ElfPackage]:
     """
     Answer the day 1 part 2 challenge question.
 
     Args:
-        calorie_list: This list represents the Calories of the food carried by all Elves
+        calorie_list: This list represents the Calories of the food carried by all
+            Elves, as text or as a buffer like `mapped_input(path)`, or an iterable of
+            lines like a file object or `iter_records(path)`
+        backend: "python" for the pure Python engine, "numpy" for the vectorized one
 
     Returns:
         list of Elf package of the elves carrying the most calories
+
+    Raises:
+        ValueError: if the backend is unknown
     """
-    all_snacks = list(calorie_list.split(ELF_SEP))
-    total_cal = [
-        ElfPackage(
-            elf=idx, cal=sum(int(snack) for snack in snack_one_elf.split(SNACK_SEP))
+    match backend:
+        case "python":
+            pass
+        case "numpy":
+            totals = elf_calories_array(_calorie_text(calorie_list))
+            return top_elves_array(totals, n=totals.size)
+        case _:
+            raise ValueError(f"Unknown backend: {backend}")
+
+    # The Elves are summed as their lines are read, only the packages are kept
+    total_cal = (
+        ElfPackage(elf=idx, cal=cal)
+        for idx, cal in enumerate(
+            iter_elf_calories(_snack_lines(calorie_list)), start=1
         )
-        for idx, snack_one_elf in enumerate(all_snacks, start=1)
-    ]
+    )
 
     return sorted(total_cal, key=lambda x: x.cal, reverse=True)
 
 
+def iter_elf_calories(snack_lines: Iterable[str | bytes]) -> Iterator[int]:
+    """
+    Compute lazily the total calories carried by each Elf.
+
+    A blank line ends the current Elf's inventory, just like `ELF_SEP` does.
+
+    Args:
+        snack_lines: one snack calorie count per line (a file handle works)
+
+    Yields:
+        the total calories of each Elf, in order
+    """
+    total = 0
+    pending = False
+    for line in snack_lines:
+        if line.strip():
+            total += int(line)
+            pending = True
+        else:
+            yield total
+            total = 0
+            pending = False
+
+    if pending:
+        yield total
+
+
+def mapped_lines(path: str | os.PathLike) -> Iterator[bytes]:
+    """
+    Read lazily the lines of a file through a read-only memory map.
+
+    The file is never loaded as a whole in Python memory nor decoded: each line is
+    handed out as a small `bytes` object that `int` can parse directly, so
+    multi-GB calorie lists only cost their page-cache footprint.
+
+    Args:
+        path: path of the file to map
+
+    Yields:
+        each line of the file, including its trailing newline
+    """
+    with mapped_input(path) as buffer:
+        if buffer:
+            yield from iter(buffer.readline, b"")
+
+
+def top_calorie_elves(
+    snack_lines: Iterable[str | bytes], n: int = 3
+) -> list[ElfPackage]:
+    """
+    Find the `n` elves carrying the most calories without sorting them all.
+
+    Only a bounded heap of `n` packages is kept in memory while the elves are read.
+    Ties are broken by elf index, exactly like `most_calorie_elves`.
+
+    Args:
+        snack_lines: one snack calorie count per line (a file handle works)
+        n: number of elves to keep
+
+    Returns:
+        list of Elf package of the `n` elves carrying the most calories
+    """
+    packages = (
+        ElfPackage(elf=idx, cal=cal)
+        for idx, cal in enumerate(iter_elf_calories(snack_lines), start=1)
+    )
+    return heapq.nlargest(n, packages, key=attrgetter("cal"))
+
+
+def elf_calories_array(calorie_list: str | bytes) -> "np.ndarray":
+    """
+    Compute the total calories carried by each Elf with NumPy.
+
+    All the snack values are parsed at once into one int64 array, then the Elves are
+    summed with a segmented `add.reduceat` starting after every blank line. An empty
+    Elf, between two consecutive blank lines, carries 0 calories like with
+    `iter_elf_calories`, and trailing newlines are ignored.
+
+    Args:
+        calorie_list: This list represents the Calories of the food carried by all Elves
+
+    Returns:
+        int64 array of the total calories of each Elf, in order
+
+    Raises:
+        ValueError: if a line contains something else than an int
+    """
+    import numpy as np
+
+    if isinstance(calorie_list, str):
+        calorie_list = calorie_list.encode()
+
+    data = np.frombuffer(calorie_list, dtype=np.uint8, count=content_stop(calorie_list))
+    line_stops = np.append(np.flatnonzero(data == ord(SNACK_SEP)), data.size)
+    line_starts = np.concatenate(([0], line_stops[:-1] + 1))
+    blank_lines = np.flatnonzero(line_stops == line_starts)
+
+    with warnings.catch_warnings():
+        # Parsing stops early on malformed data, which is reported just below
+        warnings.simplefilter("ignore", DeprecationWarning)
+        snacks = np.fromstring(calorie_list, dtype=np.int64, sep=SNACK_SEP)
+
+    if snacks.size != line_stops.size - blank_lines.size:
+        raise ValueError("Calorie list must only contain one int per line")
+
+    if snacks.size == 0:
+        return snacks
+
+    # Each blank line starts a new Elf after the snacks of the lines before it
+    elf_starts = np.concatenate(([0], blank_lines - np.arange(blank_lines.size)))
+    elf_stops = np.append(elf_starts[1:], snacks.size)
+
+    # `reduceat` sums nothing for an empty segment but returns the snack at its start:
+    # a padding snack keeps every start in range, then the empty Elves are zeroed
+    totals = np.add.reduceat(np.append(snacks, 0), elf_starts)
+    totals[elf_starts == elf_stops] = 0
+    return totals
+
+
+def top_elves_array(totals: "np.ndarray", n: int = 3) -> list[ElfPackage]:
+    """
+    Find the `n` elves carrying the most calories from an array of totals.
+
+    The candidates are selected with `argpartition` and only them are sorted. Ties are
+    broken by elf index, exactly like `most_calorie_elves`.
+
+    Args:
+        totals: total calories of each Elf, as returned by `elf_calories_array`
+        n: number of elves to keep
+
+    Returns:
+        list of Elf package of the `n` elves carrying the most calories
+    """
+    import numpy as np
+
+    n = min(n, totals.size)
+    if n <= 0:
+        return []
+
+    threshold = totals[np.argpartition(-totals, n - 1)[:n]].min()
+    candidates = np.flatnonzero(totals >= threshold)
+    best = candidates[np.lexsort((candidates, -totals[candidates]))][:n]
+
+    return [
+        ElfPackage(elf=idx, cal=cal)
+        for idx, cal in zip((best + 1).tolist(), totals[best].tolist(), strict=True)
+    ]
+
+
+def solve(
+    calorie_list: str | Buffer | Iterable[str], part: int = 1
+) -> ElfPackage | list[ElfPackage]:
+    """
+    Answer a day 1 challenge question, without any rendering.
+
+    Args:
+        calorie_list: This list represents the Calories of the food carried by all
+            Elves, as text or as a buffer like `mapped_input(path)`, or an iterable of
+            lines like a file object or `iter_records(path)`
+        part: 1 to get the elf carrying the most calories, 2 to get the top three
+
+    Returns:
+        the Elf package of part 1, or the list of Elf packages of part 2
+    """
+    if isinstance(calorie_list, str):
+        with stage("day01", "parse"):
+            snack_lines = _snack_lines(calorie_list)
+    else:
+        # The lines are split lazily, while summing them in the compute stage
+        snack_lines = _snack_lines(calorie_list)
+    with stage("day01", "compute"):
+        top3 = top_calorie_elves(snack_lines, n=3)
+    return top3[0] if part == 1 else top3
+
+
 def main():
     """Script to answer the question, with style."""
+    from rich.console import Console
+    from rich.markdown import Markdown
+    from rich.table import Table
+
+    from pymaoc2022.cache import ResultCache, input_digest
+
     console = Console()
 
+    def compute() -> tuple[ElfPackage, list[ElfPackage]]:
+        # The file is read, parsed and scored in a single streaming pass
+        with stage("day01", "compute"):
+            top3 = top_calorie_elves(mapped_lines(DATA_FILE), n=3)
+        return top3[0], top3
+
+    with stage("day01", "read"):
+        digest = input_digest(DATA_FILE)
+    _, top3 = ResultCache.default().answers(solve, digest, PARTS, compute)
+    top3 = [ElfPackage(*pkg) for pkg in top3]
+
     with (
+        stage("day01", "render"),
         open(INSTRUCTIONS / "day01_part1.md") as part_one,
         open(INSTRUCTIONS / "day01_part2.md") as part_two,
-        open(BASE_DIRE / "calories_list.data") as cal_f,
     ):
-        cal_list = cal_f.read()
         console.print(Markdown(part_one.read()))
 
         console.print()
 
-        top1 = most_calorie_elf(cal_list)
+        top1 = top3[0]
 
         console.print(
             f"The elf with the most calories is n°{top1.elf}", justify="center"
@@ -84,8 +489,6 @@ def main():
 
         console.print()
 
-        top3 = most_calorie_elves(cal_list)
-
         console.print("The top three Elves carrying the most Calories are:")
 
         console.print()
@@ -94,11 +497,11 @@ def main():
         table.add_column("Elf", justify="left", style="bold green")
         table.add_column("Calories", justify="left", style="yellow")
         table.add_column("Rank", justify="center")
-        for pkg, medal in zip(top3[:3], RANK, strict=True):
+        for pkg, medal in zip(top3, RANK, strict=True):
             table.add_row(f"n°{pkg.elf}", f"{pkg.cal} cal", medal)
         console.print(table, justify="center")
 
-        total = sum(pkg.cal for pkg in top3[:3])
+        total = sum(pkg.cal for pkg in top3)
         console.print(f"And altogether they carry {total} calories", justify="center")
 
 
@@ -1,19 +1,28 @@
 #!/usr/bin/env python
 """Solution to day 2 challenge."""
 
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Mapping
 from enum import StrEnum
+from itertools import accumulate
 from pathlib import Path
 
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.table import Table
-
+from pymaoc2022.instrumentation import stage
+from pymaoc2022.records import (
+    BUFFER_TYPES,
+    Buffer,
+    iter_buffer_records,
+    iter_lines,
+    mapped_input,
+)
 
 ROUND_SEP = "\n"
 ORDER_SEP = " "
 
 BASE_DIRE = Path(__file__).parent
 INSTRUCTIONS = BASE_DIRE / "instructions"
+DATA_FILE = BASE_DIRE / "strategy_guide.data"
+PARTS = (1, 2)
 
 
 class ElfShape(StrEnum):
@@ -114,51 +123,261 @@ def compute_one_score(round: str, part: int = 1) -> int:
         )
 
 
-def compute_all_scores(round_list: str, part: int = 1) -> list[int]:
+def compile_score_table(part: int = 1) -> dict[str, int]:
+    """
+    Precompute the score of each of the 9 possible rounds.
+
+    Args:
+        part: 1 to compute part 1 score 2 to compute part 2 score
+
+    Returns:
+        the score of each possible round string
+    """
+    return {
+        fight: compute_one_score(fight, part)
+        for fight in (f"{elf}{ORDER_SEP}{me}" for elf in ElfShape for me in MyShape)
+    }
+
+
+SCORE_TABLES = {1: compile_score_table(part=1), 2: compile_score_table(part=2)}
+
+
+def score_table(part: int = 1) -> dict[str, int]:
+    """
+    Get the precomputed score of each possible round.
+
+    Args:
+        part: 1 to compute part 1 score 2 to compute part 2 score
+
+    Returns:
+        the score of each possible round string
+    """
+    return SCORE_TABLES[1] if part == 1 else SCORE_TABLES[2]
+
+
+def iter_scores(rounds: Iterable[str], part: int = 1) -> Iterator[int]:
+    """
+    Compute lazily the score of each round.
+
+    Args:
+        rounds: one round per item, trailing newlines are ignored (a file works)
+        part: 1 to compute part 1 score 2 to compute part 2 score
+
+    Yields:
+        the score of each round, in order
+
+    Raises:
+        ValueError: if a round is not a valid strategy
+    """
+    table = score_table(part)
+    try:
+        yield from map(table.__getitem__, (fight.rstrip(ROUND_SEP) for fight in rounds))
+    except KeyError as err:
+        raise ValueError(f"Unknown round: {err.args[0]!r}") from err
+
+
+def running_scores(scores: Iterable[int], window: int | None = None) -> Iterator[int]:
+    """
+    Compute lazily the running total of the scores.
+
+    Args:
+        scores: score of each round
+        window: if given, only sum the scores of the last `window` rounds
+
+    Yields:
+        the total score after each round
+
+    Raises:
+        ValueError: if the window is not a positive int
+    """
+    if window is None:
+        yield from accumulate(scores)
+        return
+
+    if window < 1:
+        raise ValueError(f"Window must be a positive number of rounds: {window}")
+
+    recent = deque(maxlen=window)
+    total = 0
+    for score in scores:
+        if len(recent) == window:
+            total -= recent[0]
+        recent.append(score)
+        total += score
+        yield total
+
+
+def _rounds(round_list: str | Buffer | Iterable[str]) -> Iterable[str]:
+    """Split a strategy list, unless it is already an iterable of rounds."""
+    if isinstance(round_list, str):
+        return round_list.split(ROUND_SEP)
+    if isinstance(round_list, BUFFER_TYPES):
+        return map(bytes.decode, iter_buffer_records(round_list, ROUND_SEP))
+    return iter_lines(round_list)
+
+
+def compute_all_scores(
+    round_list: str | Buffer | Iterable[str], part: int = 1
+) -> list[int]:
     """
     Compute all scores for a whole strategy list.
 
     Args:
-        round_list: Strategy list for all the rounds
+        round_list: Strategy list for all the rounds, as text or as a buffer like
+            `mapped_input(path)`, or an iterable of rounds
         part: 1 to compute part 1 score 2 to compute part 2 score
 
     Returns:
         a list of all the scores for a given strategy list.
+
+    Raises:
+        ValueError: if a round is not a valid strategy
     """
-    rounds = list(round_list.split(ROUND_SEP))
-    return [compute_one_score(fight, part) for fight in rounds]
+    return list(iter_scores(_rounds(round_list), part))
 
 
-def compute_global_score(round_list: str, part: int = 1) -> int:
+def compute_global_score(
+    round_list: str | Buffer | Iterable[str], part: int = 1
+) -> int:
     """
     Answer the day 1 part 1 challenge question.
 
+    A buffer is scored from its round histogram, so only the 9 kinds of round are
+    ever decoded.
+
     Args:
-        round_list: Strategy list for all the rounds
+        round_list: Strategy list for all the rounds, as text or as a buffer like
+            `mapped_input(path)`, or an iterable of rounds
         part: 1 to compute part 1 score 2 to compute part 2 score
 
     Returns:
         the total score of all the rounds
+
+    Raises:
+        ValueError: if a round is not a valid strategy
     """
-    return sum(compute_all_scores(round_list, part))
+    if isinstance(round_list, BUFFER_TYPES):
+        return score_histogram(round_histogram(round_list), part)
+
+    return sum(iter_scores(_rounds(round_list), part))
+
+
+def round_histogram(round_list: str | Buffer | Iterable[str]) -> Counter[str]:
+    """
+    Count how many times each kind of round appears in a strategy list.
+
+    There are only 9 kinds of round, so the histogram is all what is needed to score a
+    strategy list, whatever the part or the scoring rules.
+
+    Args:
+        round_list: Strategy list for all the rounds, as text or as a buffer like
+            `mapped_input(path)`, or an iterable of rounds (a file works)
+
+    Returns:
+        the number of occurrences of each round string
+    """
+    if isinstance(round_list, str):
+        return Counter(round_list.split(ROUND_SEP))
+
+    if not isinstance(round_list, BUFFER_TYPES):
+        return Counter(iter_lines(round_list))
+
+    raw = Counter(iter_buffer_records(round_list, ROUND_SEP))
+    return Counter({fight.decode(): count for fight, count in raw.items()})
+
+
+def score_histogram(
+    histogram: Mapping[str, int],
+    part: int = 1,
+    table: Mapping[str, int] | None = None,
+) -> int:
+    """
+    Compute the total score of a strategy list from its round histogram.
+
+    Args:
+        histogram: number of occurrences of each round string
+        part: 1 to compute part 1 score 2 to compute part 2 score
+        table: custom score of each round string, overrides `part` if given
+
+    Returns:
+        the total score of all the rounds
+
+    Raises:
+        ValueError: if a round is not a valid strategy
+    """
+    table = score_table(part) if table is None else table
+    try:
+        return sum(table[fight] * count for fight, count in histogram.items())
+    except KeyError as err:
+        raise ValueError(f"Unknown round: {err.args[0]!r}") from err
+
+
+def compute_both_scores(round_list: str | Buffer | Iterable[str]) -> tuple[int, int]:
+    """
+    Answer both day 2 challenge questions in a single pass.
+
+    Args:
+        round_list: Strategy list for all the rounds, as text or as a buffer like
+            `mapped_input(path)`, or an iterable of rounds (a file works)
+
+    Returns:
+        the total score of all the rounds for part 1 and part 2
+    """
+    with stage("day02", "parse"):
+        histogram = round_histogram(round_list)
+    with stage("day02", "compute"):
+        return score_histogram(histogram, part=1), score_histogram(histogram, part=2)
+
+
+def solve(round_list: str | Buffer | Iterable[str], part: int = 1) -> int:
+    """
+    Answer a day 2 challenge question, without any rendering.
+
+    Args:
+        round_list: Strategy list for all the rounds, as text or as a buffer like
+            `mapped_input(path)`, or an iterable of rounds like `iter_records(path)`
+        part: 1 to compute part 1 score 2 to compute part 2 score
+
+    Returns:
+        the total score of all the rounds
+    """
+    if not isinstance(round_list, str):
+        # Buffers and iterables of rounds are parsed as they are scored
+        with stage("day02", "compute"):
+            return compute_global_score(round_list, part)
+
+    with stage("day02", "parse"):
+        rounds = _rounds(round_list)
+    with stage("day02", "compute"):
+        return compute_global_score(rounds, part)
 
 
 def main():
     """Script to answer the question, with style."""
+    from rich.console import Console
+    from rich.markdown import Markdown
+    from rich.table import Table
+
+    from pymaoc2022.cache import ResultCache, input_digest
+
     console = Console()
 
+    with mapped_input(DATA_FILE) as round_list:
+        with stage("day02", "read"):
+            digest = input_digest(round_list)
+        score_1, score_2 = ResultCache.default().answers(
+            solve, digest, PARTS, lambda: compute_both_scores(round_list)
+        )
+
     with (
+        stage("day02", "render"),
         open(INSTRUCTIONS / "day02_part1.md") as part_one,
         open(INSTRUCTIONS / "day02_part2.md") as part_two,
-        open(BASE_DIRE / "strategy_guide.data") as strat_f,
     ):
-        strat_list = strat_f.read()
         console.print(Markdown(part_one.read()))
 
         console.print()
 
-        score_1 = compute_global_score(strat_list)
-
         console.print(f"Hypothetic score: {score_1}", justify="center")
 
         console.print()
@@ -167,8 +386,6 @@ def main():
 
         console.print()
 
-        score_2 = compute_global_score(strat_list, part=2)
-
         console.print(f"Less hypothetic score: {score_2}", justify="center")
 
 
@@ -1,17 +1,33 @@
 #!/usr/bin/env python
 """Solution to day 2 challenge."""
 
+import re
 import string
+from collections.abc import Iterable
 from pathlib import Path
-
-from more_itertools import chunked
-from rich.console import Console
-from rich.markdown import Markdown
+from typing import TYPE_CHECKING
+
+from pymaoc2022.instrumentation import stage
+from pymaoc2022.records import (
+    BUFFER_TYPES,
+    Buffer,
+    content_stop,
+    iter_buffer_records,
+    iter_lines,
+    mapped_input,
+)
+from pymaoc2022.validation import is_trusted
+
+if TYPE_CHECKING:
+    import numpy as np
 
 BAG_SEP = "\n"
+RUCKSACK_LIST_RE = re.compile(r"[a-zA-Z]+(?:\n[a-zA-Z]+)*")
 
 BASE_DIRE = Path(__file__).parent
 INSTRUCTIONS = BASE_DIRE / "instructions"
+DATA_FILE = BASE_DIRE / "rucksack_contents.data"
+PARTS = (1, 2)
 
 
 def split_in_half(content: str) -> tuple[str, str]:
@@ -114,6 +130,243 @@ def priority(item: str) -> int:
         raise ValueError(f"Item must be an ascii letter: {item}")
 
 
+PRIORITIES = {item: priority(item) for item in string.ascii_letters}
+ITEM_BITS = {item: 1 << (priority(item) - 1) for item in string.ascii_letters}
+
+
+def item_mask(items: str) -> int:
+    """
+    Encode a set of items as a 52 bits mask, one bit per priority.
+
+    Args:
+        items: string of items. Must be letters.
+
+    Returns:
+        mask where bit `n` is set if the item of priority `n + 1` is present
+
+    Raises:
+        ValueError: if an item is not an ascii letter
+    """
+    try:
+        # Bits of distinct items never overlap so summing them is OR-ing them
+        return sum(map(ITEM_BITS.__getitem__, {*items}))
+    except KeyError as err:
+        raise ValueError(f"Item must be an ascii letter: {err.args[0]}") from err
+
+
+def mask_items(mask: int) -> str:
+    """
+    Decode a mask of items.
+
+    Args:
+        mask: mask as built by `item_mask`
+
+    Returns:
+        the items present in the mask, sorted by priority
+    """
+    return "".join(item for item, bit in ITEM_BITS.items() if mask & bit)
+
+
+def misplaced_mask(rucksack: str) -> int:
+    """
+    Get the misplaced item of a rucksack, as a mask.
+
+    Args:
+        rucksack: string representing the content of one rucksack
+
+    Returns:
+        mask with only the bit of the misplaced item set
+
+    Raises:
+        ValueError: if rucksack contains no or multiple misplaced items
+    """
+    left_compartment, right_compartment = split_in_half(rucksack)
+    intersection = item_mask(left_compartment) & item_mask(right_compartment)
+
+    return _check_misplaced_mask(intersection, rucksack)
+
+
+def _check_misplaced_mask(intersection: int, rucksack: str) -> int:
+    """Check that the compartments of a rucksack have exactly one item in common."""
+    if intersection & (intersection - 1):
+        raise ValueError(
+            f"Rucksack contains multiple misplaced snacks: {mask_items(intersection)}"
+        )
+
+    if not intersection:
+        raise ValueError(f"Rucksack contains no misplaced snacks: {rucksack}")
+
+    return intersection
+
+
+def badge_mask(group: list[str]) -> int:
+    """
+    Get the identification badge item of a group of rucksack, as a mask.
+
+    Args:
+        group: group of 3 rucksack belonging to a group of elves
+
+    Returns:
+        mask with only the bit of the identification badge set
+
+    Raises:
+        ValueError: if the group of rucksack contains no or multiple badges
+    """
+    if len(group) != 3:
+        raise ValueError(f"A group must be constituted of 3 rucksack: {group}")
+
+    bag1, bag2, bag3 = group
+    intersection = item_mask(bag1) & item_mask(bag2) & item_mask(bag3)
+
+    return _check_badge_mask(intersection, group)
+
+
+def _check_badge_mask(intersection: int, group: list[str]) -> int:
+    """Check that the rucksacks of a group have exactly one item in common."""
+    if intersection & (intersection - 1):
+        raise ValueError(f"Group contains multiple badges: {mask_items(intersection)}")
+
+    if not intersection:
+        raise ValueError(f"Group contains no badge: {group}")
+
+    return intersection
+
+
+def _rucksack_bits_array(
+    rucksack_list: str | Buffer,
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Translate all the rucksacks to item bits in one lookup-table step.
+
+    The trailing newlines of a buffer are ignored, like `iter_buffer_records` does.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`
+
+    Returns:
+        the bit of each byte (0 for newlines), and the start and length of each line
+
+    Raises:
+        ValueError: if an item is not an ascii letter or a rucksack is empty
+    """
+    import numpy as np
+
+    if isinstance(rucksack_list, str):
+        rucksack_list = rucksack_list.encode()
+        stop = len(rucksack_list)
+    else:
+        stop = content_stop(rucksack_list)
+
+    lut = np.zeros(256, dtype=np.uint64)
+    for item, bit in ITEM_BITS.items():
+        lut[ord(item)] = bit
+
+    data = np.frombuffer(rucksack_list, dtype=np.uint8, count=stop)
+    try:
+        bits = lut[data]
+        newline = data == ord(BAG_SEP)
+    finally:
+        # Release the view at once, or a memory map can not be closed on errors
+        del data
+    if np.any((bits == 0) & ~newline):
+        raise ValueError("Items must be ascii letters")
+
+    line_stops = np.append(np.flatnonzero(newline), bits.size)
+    line_starts = np.concatenate(([0], line_stops[:-1] + 1))
+    lengths = line_stops - line_starts
+    if np.any(lengths == 0):
+        raise ValueError("Rucksack list contains empty rucksacks")
+
+    return bits, line_starts, lengths
+
+
+def _single_bit_priorities(masks: "np.ndarray", what: str) -> "np.ndarray":
+    """
+    Get the priority of masks that must contain exactly one item.
+
+    Args:
+        masks: array of item masks
+        what: description of the masks for error messages
+
+    Returns:
+        the priority of the item of each mask
+
+    Raises:
+        ValueError: if a mask contains no or multiple items
+    """
+    import numpy as np
+
+    if np.any(masks == 0):
+        raise ValueError(f"Some {what} contain no item")
+
+    if np.any(masks & (masks - np.uint64(1))):
+        raise ValueError(f"Some {what} contain multiple items")
+
+    # Exact for powers of 2 up to 2**52
+    return np.log2(masks).astype(np.int64) + 1
+
+
+def misplaced_priorities_array(rucksack_list: str | Buffer) -> "np.ndarray":
+    """
+    Compute the priority of each rucksac misplaced item with NumPy.
+
+    The presence bitmap of each half is OR-reduced with a segmented `reduceat` and
+    the two halves are ANDed together.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks
+
+    Returns:
+        array of all the priorities
+
+    Raises:
+        ValueError: if a rucksack is malformed or contains no or multiple misplaced
+            items
+    """
+    import numpy as np
+
+    bits, line_starts, lengths = _rucksack_bits_array(rucksack_list)
+    if np.any(lengths % 2):
+        raise ValueError("We won't handle the not even rucksacks")
+
+    halves = np.empty(2 * line_starts.size, dtype=np.int64)
+    halves[0::2] = line_starts
+    halves[1::2] = line_starts + lengths // 2
+    # Right halves also reduce the newline that follows them, whose bit is 0
+    masks = np.bitwise_or.reduceat(bits, halves)
+
+    return _single_bit_priorities(masks[0::2] & masks[1::2], "rucksacks")
+
+
+def badges_priorities_array(rucksack_list: str | Buffer) -> "np.ndarray":
+    """
+    Compute the priority of each identification badges with NumPy.
+
+    The presence bitmap of each rucksack is OR-reduced with a segmented `reduceat`
+    and the rows of each group of 3 are ANDed together.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks
+
+    Returns:
+        array of all the priorities
+
+    Raises:
+        ValueError: if the rucksacks can not be grouped by 3 or a group contains no
+            or multiple badges
+    """
+    import numpy as np
+
+    bits, line_starts, _ = _rucksack_bits_array(rucksack_list)
+    if line_starts.size % 3:
+        raise ValueError("A group must be constituted of 3 rucksack")
+
+    masks = np.bitwise_or.reduceat(bits, line_starts).reshape(-1, 3)
+
+    return _single_bit_priorities(np.bitwise_and.reduce(masks, axis=1), "groups")
+
+
 def one_misplaced_priority(rucksack: str) -> int:
     """
     Compute the priority of the misplaced item of one rucksack.
@@ -140,69 +393,272 @@ def one_badge_priority(group: list[str]) -> int:
     return priority(badge_item(group))
 
 
-def all_misplaced_priorities(rucksack_list: str) -> int:
+def _rucksacks(rucksack_list: str | Buffer | Iterable[str]) -> Iterable[str]:
+    """Split a rucksack list, unless it is already an iterable of rucksacks."""
+    if isinstance(rucksack_list, str):
+        return rucksack_list.split(BAG_SEP)
+    if isinstance(rucksack_list, BUFFER_TYPES):
+        return map(bytes.decode, iter_buffer_records(rucksack_list, BAG_SEP))
+    return iter_lines(rucksack_list)
+
+
+def _rucksack_text(rucksack_list: str | Buffer | Iterable[str]) -> str | Buffer:
+    """Join the rucksacks of a rucksack list, for the engines needing a buffer."""
+    if isinstance(rucksack_list, (str, *BUFFER_TYPES)):
+        return rucksack_list
+    return BAG_SEP.join(iter_lines(rucksack_list))
+
+
+def all_misplaced_priorities(
+    rucksack_list: str | Buffer | Iterable[str], backend: str = "set"
+) -> list[int]:
     """
     Compute the priority of each rucksac misplaced item.
 
     Args:
-        rucksack_list: string representing the content of all rucksacks
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`, or an iterable of rucksacks
+        backend: "set" to intersect sets of items, "bitmask" to AND masks of items,
+            "numpy" to AND arrays of masks
 
     Returns:
         all list of all the priorities
-    """
-    return [one_misplaced_priority(bag) for bag in rucksack_list.split(BAG_SEP)]
-
 
-def all_badges_priorities(rucksack_list: str) -> int:
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    match backend:
+        case "set":
+            return [one_misplaced_priority(bag) for bag in _rucksacks(rucksack_list)]
+        case "bitmask":
+            return [
+                misplaced_mask(bag).bit_length() for bag in _rucksacks(rucksack_list)
+            ]
+        case "numpy":
+            return misplaced_priorities_array(_rucksack_text(rucksack_list)).tolist()
+        case _:
+            raise ValueError(f"Unknown backend: {backend}")
+
+
+def all_badges_priorities(
+    rucksack_list: str | Buffer | Iterable[str], backend: str = "set"
+) -> list[int]:
     """
     Compute the priority of each identification badges.
 
     Args:
-        rucksack_list: string representing the content of all rucksacks
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`, or an iterable of rucksacks
+        backend: "set" to intersect sets of items, "bitmask" to AND masks of items,
+            "numpy" to AND arrays of masks
 
     Returns:
         all list of all the priorities
+
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    from more_itertools import chunked
+
+    match backend:
+        case "set":
+            return [
+                one_badge_priority(group)
+                for group in chunked(_rucksacks(rucksack_list), 3)
+            ]
+        case "bitmask":
+            return [
+                badge_mask(group).bit_length()
+                for group in chunked(_rucksacks(rucksack_list), 3)
+            ]
+        case "numpy":
+            return badges_priorities_array(_rucksack_text(rucksack_list)).tolist()
+        case _:
+            raise ValueError(f"Unknown backend: {backend}")
+
+
+def check_rucksack_list(rucksack_list: str, part: int = 1):
+    """
+    Check a whole rucksack list at once, instead of each rucksack.
+
+    Only the alphabet and the number of rucksacks are checked, the compartments and
+    the groups content are trusted.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks
+        part: 1 to check for part 1, 2 to also check that rucksacks can be grouped
+
+    Raises:
+        ValueError: if the rucksack list is malformed
     """
-    return [
-        one_badge_priority(group) for group in chunked(rucksack_list.split(BAG_SEP), 3)
-    ]
+    if not RUCKSACK_LIST_RE.fullmatch(rucksack_list):
+        raise ValueError("Rucksack list must be non empty lines of ascii letters")
+
+    if part != 1 and (rucksack_list.count(BAG_SEP) + 1) % 3:
+        raise ValueError("A group must be constituted of 3 rucksack")
 
 
-def compute_total_priorities(rucksack_list: str, part: int = 1) -> int:
+def _trusted_misplaced_priority(rucksack: str) -> int:
+    """Compute the priority of the misplaced item of a trusted rucksack."""
+    half = len(rucksack) // 2
+    return PRIORITIES[({*rucksack[:half]} & {*rucksack[half:]}).pop()]
+
+
+def _trusted_badge_priority(bag1: str, bag2: str, bag3: str) -> int:
+    """Compute the priority of the badge of a trusted group of rucksack."""
+    return PRIORITIES[({*bag1} & {*bag2} & {*bag3}).pop()]
+
+
+def compute_total_priorities(
+    rucksack_list: str | Buffer | Iterable[str], part: int = 1, backend: str = "set"
+) -> int:
     """
     Answer the day 3 part 1 challenge question.
 
+    In trusted validation mode, the "set" backend only checks the rucksack list as a
+    whole with `check_rucksack_list` instead of checking each rucksack. A buffer or
+    an iterable of rucksacks is not checked as a whole, each of its rucksacks is.
+
     Args:
-        rucksack_list: string representing the content of all rucksacks
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`, or an iterable of lines like a file object or
+            `iter_records(path)`
         part: 1 to compute part 1 score 2 to compute part 2 score
+        backend: "set" to intersect sets of items, "bitmask" to AND masks of items,
+            "numpy" to AND arrays of masks
 
     Returns:
         the sum of all the priorities of the misplaced items
+
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    if backend == "set" and is_trusted() and isinstance(rucksack_list, str):
+        with stage("day03", "parse"):
+            check_rucksack_list(rucksack_list, part)
+            rucksacks = rucksack_list.split(BAG_SEP)
+        with stage("day03", "compute"):
+            if part == 1:
+                return sum(map(_trusted_misplaced_priority, rucksacks))
+            else:
+                groups = [iter(rucksacks)] * 3
+                return sum(map(_trusted_badge_priority, *groups))
+
+    # Each rucksack is parsed and scored in the same pass
+    with stage("day03", "compute"):
+        if backend == "numpy":
+            rucksack_list = _rucksack_text(rucksack_list)
+            if part == 1:
+                return int(misplaced_priorities_array(rucksack_list).sum())
+            else:
+                return int(badges_priorities_array(rucksack_list).sum())
+
+        if part == 1:
+            return sum(all_misplaced_priorities(rucksack_list, backend))
+        else:
+            return sum(all_badges_priorities(rucksack_list, backend))
+
+
+def compute_both_priorities(
+    rucksack_list: str | Buffer | Iterable[str],
+) -> tuple[int, int]:
+    """
+    Answer both day 3 challenge questions in a single pass.
+
+    Each rucksack is encoded once as the masks of its two compartments: their AND
+    gives the misplaced item and their OR feeds the running badge of its group.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`, or an iterable of rucksacks (trailing newlines
+            are ignored, so a file works)
+
+    Returns:
+        the sum of the misplaced items priorities and of the badges priorities
+
+    Raises:
+        ValueError: if a rucksack or a group of rucksacks is invalid
     """
-    if part == 1:
-        return sum(all_misplaced_priorities(rucksack_list))
+    if isinstance(rucksack_list, str):
+        with stage("day03", "parse"):
+            rucksack_list = rucksack_list.split(BAG_SEP)
     else:
-        return sum(all_badges_priorities(rucksack_list))
+        rucksack_list = _rucksacks(rucksack_list)
+
+    with stage("day03", "compute"):
+        return _both_priorities(rucksack_list)
+
+
+def _both_priorities(rucksack_list: Iterable[str]) -> tuple[int, int]:
+    """Fused single pass of `compute_both_priorities`."""
+    total_misplaced = total_badges = 0
+    group = []
+    badge = ~0
+    for rucksack in rucksack_list:
+        left_compartment, right_compartment = split_in_half(rucksack)
+        left_mask = item_mask(left_compartment)
+        right_mask = item_mask(right_compartment)
+
+        misplaced = _check_misplaced_mask(left_mask & right_mask, rucksack)
+        total_misplaced += misplaced.bit_length()
+
+        group.append(rucksack)
+        badge &= left_mask | right_mask
+        if len(group) == 3:
+            total_badges += _check_badge_mask(badge, group).bit_length()
+            group = []
+            badge = ~0
+
+    if group:
+        raise ValueError(f"A group must be constituted of 3 rucksack: {group}")
+
+    return total_misplaced, total_badges
+
+
+def solve(rucksack_list: str | Buffer | Iterable[str], part: int = 1) -> int:
+    """
+    Answer a day 3 challenge question, without any rendering.
+
+    Args:
+        rucksack_list: string representing the content of all rucksacks, or a buffer
+            like `mapped_input(path)`, or an iterable of lines like a file object or
+            `iter_records(path)`
+        part: 1 to compute part 1 score 2 to compute part 2 score
+
+    Returns:
+        the sum of the priorities of the misplaced items or of the badges
+    """
+    return compute_total_priorities(rucksack_list, part)
 
 
 def main():
     """Script to answer the question, with style."""
+    from rich.console import Console
+    from rich.markdown import Markdown
+
+    from pymaoc2022.cache import ResultCache, input_digest
+
     console = Console()
 
+    with mapped_input(DATA_FILE) as rucksack_list:
+        with stage("day03", "read"):
+            digest = input_digest(rucksack_list)
+        # The rucksacks are decoded one by one while they are scored
+        total_misplaced, total_badges = ResultCache.default().answers(
+            solve, digest, PARTS, lambda: compute_both_priorities(rucksack_list)
+        )
+
     with (
+        stage("day03", "render"),
         open(INSTRUCTIONS / "day03_part1.md") as part_one,
         open(INSTRUCTIONS / "day02_part2.md") as part_two,
-        open(BASE_DIRE / "rucksack_contents.data") as ruck_f,
     ):
-        ruck_list = ruck_f.read()
         console.print(Markdown(part_one.read()))
 
         console.print()
 
-        total_misplaced_priority = compute_total_priorities(ruck_list)
-
         console.print(
-            f"Sum of the misplaced item's priorities: {total_misplaced_priority}",
+            f"Sum of the misplaced item's priorities: {total_misplaced}",
             justify="center",
         )
 
@@ -212,10 +668,8 @@ def main():
 
         console.print()
 
-        total_badges_priority = compute_total_priorities(ruck_list, part=2)
-
         console.print(
-            f"Sum of the identification badges priorities: {total_badges_priority}",
+            f"Sum of the identification badges priorities: {total_badges}",
             justify="center",
         )
 
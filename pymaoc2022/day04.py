@@ -1,19 +1,41 @@
 """Solve day 4 puzzle."""
 
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from itertools import accumulate
+from operator import and_, ge, le, or_
 from pathlib import Path
-from typing import Self
-
-from rich.console import Console
-from rich.markdown import Markdown
+from typing import NamedTuple, Self
+
+from pymaoc2022.instrumentation import stage
+from pymaoc2022.records import (
+    BUFFER_TYPES,
+    Buffer,
+    content_stop,
+    iter_lines,
+    mapped_input,
+)
+from pymaoc2022.validation import is_trusted
 
 LINE_SEP = "\n"
 PAIR_SEP = ","
 RANGE_SEP = "-"
+ASSIGNMENTS_LIST_RE = re.compile(r"\d+-\d+,\d+-\d+(?:\n\d+-\d+,\d+-\d+)*")
+ASSIGNMENTS_LIST_BYTES_RE = re.compile(rb"\d+-\d+,\d+-\d+(?:\n\d+-\d+,\d+-\d+)*")
+BOUND_RE = re.compile(r"\d+")
+BOUND_BYTES_RE = re.compile(rb"\d+")
+ASSIGNMENT_RE = re.compile(r"(\d+)-(\d+),(\d+)-(\d+)")
+ASSIGNMENT_BYTES_RE = re.compile(rb"(\d+)-(\d+),(\d+)-(\d+)")
 
 
 BASE_DIRE = Path(__file__).parent
 INSTRUCTIONS = BASE_DIRE / "instructions"
+DATA_FILE = BASE_DIRE / "pair_assignments.data"
+PARTS = (1,)
 
 
 @dataclass(frozen=True)
@@ -25,11 +47,14 @@ class WorkRange:
 
     def __post_init__(self: Self):
         """
-        Check if the WorkRange is valid.
+        Check if the WorkRange is valid, unless in trusted validation mode.
 
         Raises:
             ValueError if stop is before start.
         """
+        if is_trusted():
+            return
+
         if not isinstance(self.start, int) or not isinstance(self.stop, int):
             raise ValueError(f"Mistyped WorkRange, start and stop must be ints: {self}")
 
@@ -65,6 +90,98 @@ class WorkRange:
         return cls(*(int(val) for val in s.split(RANGE_SEP)))
 
 
+@dataclass(frozen=True)
+class WorkRangeBatch:
+    """
+    Represent the work assignments of many pairs of elves, column by column.
+
+    Bounds are stored in compact `array('I')` columns and the predicates are mapped
+    over whole columns, so no object is created per pair.
+    """
+
+    start1: array
+    stop1: array
+    start2: array
+    stop2: array
+
+    def __post_init__(self: Self):
+        """
+        Check if the WorkRangeBatch is valid, unless in trusted validation mode.
+
+        Raises:
+            ValueError if columns are of different length or a stop is before its
+            start.
+        """
+        if is_trusted():
+            return
+
+        columns = (self.start1, self.stop1, self.start2, self.stop2)
+        if len({len(column) for column in columns}) != 1:
+            raise ValueError("Mismatched WorkRangeBatch, columns must have same length")
+
+        if not all(map(le, self.start1, self.stop1)) or not all(
+            map(le, self.start2, self.stop2)
+        ):
+            raise ValueError("Malformed WorkRangeBatch, some stops are before starts")
+
+    def __len__(self: Self) -> int:
+        """Number of pairs in the batch."""
+        return len(self.start1)
+
+    def fully_contains(self: Self) -> Iterator[bool]:
+        """
+        Tell for each pair if one range fully contains the other.
+
+        Returns:
+            lazily, True for each pair where one range fully contains the other
+        """
+        first_contains = map(
+            and_, map(le, self.start1, self.start2), map(ge, self.stop1, self.stop2)
+        )
+        second_contains = map(
+            and_, map(le, self.start2, self.start1), map(ge, self.stop2, self.stop1)
+        )
+        return map(or_, first_contains, second_contains)
+
+    def overlaps(self: Self) -> Iterator[bool]:
+        """
+        Tell for each pair if the ranges overlap at all.
+
+        Returns:
+            lazily, True for each pair where the ranges share at least one section
+        """
+        return map(
+            and_, map(le, self.start1, self.stop2), map(le, self.start2, self.stop1)
+        )
+
+    @classmethod
+    def from_str(cls: type[Self], assignments_list: str | Buffer) -> Self:
+        """
+        Build a WorkRangeBatch from a whole assignments list.
+
+        Args:
+            assignments_list: text or bytes representing the work assignment of all
+                elf pair, or a buffer like `mapped_input(path)` scanned in place
+
+        Returns:
+            a valid WorkRangeBatch
+
+        Raises:
+            ValueError: if the assignments list is malformed or a bound does not fit
+                in an unsigned 32 bits int
+        """
+        check_assignments_list(assignments_list)
+        pattern = BOUND_RE if isinstance(assignments_list, str) else BOUND_BYTES_RE
+        try:
+            bounds = array("I", map(int, pattern.findall(assignments_list)))
+        except OverflowError as err:
+            raise ValueError(
+                f"Section out of the range of WorkRangeBatch: {err}"
+            ) from err
+
+        return cls(bounds[0::4], bounds[1::4], bounds[2::4], bounds[3::4])
+
+
 def parse_line(line: str) -> tuple[WorkRange, WorkRange]:
     """
     Parse a string representing a work assignment for a pair of elves.
@@ -86,34 +203,415 @@ def is_overlapped(line: str) -> True:
     return a.fully_contains(b) or b.fully_contains(a)
 
 
-def nb_overlap(assignments_list: str) -> int:
+def check_assignments_list(assignments_list: str | Buffer):
+    """
+    Check a whole assignments list at once, instead of each WorkRange.
+
+    Only the format of the lines is checked, the ranges bounds are trusted. The
+    trailing newlines of a buffer are ignored, like `iter_buffer_records` does.
+
+    Args:
+        assignments_list: text or bytes representing the work assignment of all elf
+            pair
+
+    Raises:
+        ValueError: if the assignments list is malformed
+    """
+    pattern = ASSIGNMENTS_LIST_RE
+    stop = len(assignments_list)
+    if not isinstance(assignments_list, str):
+        pattern = ASSIGNMENTS_LIST_BYTES_RE
+        stop = content_stop(assignments_list)
+
+    if not pattern.fullmatch(assignments_list, 0, stop):
+        raise ValueError("Assignments list must be lines of the form `a-b,c-d`")
+
+
+def _iter_record_assignments(
+    assignments: Iterable[str],
+) -> Iterator[tuple[int, int, int, int]]:
+    """Extract the bounds of each pair of elves, one line at a time."""
+    trusted = is_trusted()
+    for idx, line in enumerate(iter_lines(assignments), start=1):
+        if not (match := ASSIGNMENT_RE.fullmatch(line)):
+            raise ValueError(f"Malformed assignment on line {idx}: {line}")
+
+        start1, stop1, start2, stop2 = bounds = tuple(map(int, match.groups()))
+        if not trusted and (start1 > stop1 or start2 > stop2):
+            raise ValueError(f"Malformed WorkRange: {line}")
+        yield bounds
+
+
+def iter_assignments(
+    assignments_list: str | Buffer | Iterable[str],
+) -> Iterator[tuple[int, int, int, int]]:
+    """
+    Extract the bounds of each pair of elves in a single scan of the whole buffer.
+
+    In strict validation mode, each line must exactly match `a-b,c-d` with a <= b
+    and c <= d. In trusted validation mode, the buffer is only checked as a whole
+    with `check_assignments_list`. Records from an iterable are matched one by one,
+    their bounds order is only checked in strict validation mode. The trailing
+    newlines of a buffer are ignored, like `iter_buffer_records` does.
+
+    Args:
+        assignments_list: text or bytes representing the work assignment of all elf
+            pair, a buffer like `mapped_input(path)` scanned in place, or an iterable
+            of lines like a file object or `iter_records(path)`
+
+    Yields:
+        start and stop of the first elf, then start and stop of the second elf
+
+    Raises:
+        ValueError: if the assignments list is malformed
+    """
+    if isinstance(assignments_list, str):
+        pattern = ASSIGNMENT_RE
+        stop = len(assignments_list)
+    elif isinstance(assignments_list, BUFFER_TYPES):
+        pattern = ASSIGNMENT_BYTES_RE
+        stop = content_stop(assignments_list)
+    else:
+        yield from _iter_record_assignments(assignments_list)
+        return
+
+    if is_trusted():
+        check_assignments_list(assignments_list)
+        for match in pattern.finditer(assignments_list, 0, stop):
+            yield tuple(map(int, match.groups()))
+        return
+
+    line_sep = LINE_SEP if isinstance(assignments_list, str) else LINE_SEP.encode()
+    line_start = 0
+    for match in pattern.finditer(assignments_list, 0, stop):
+        if match.start() != line_start:
+            raise ValueError(f"Malformed assignment at character {line_start}")
+        line_start = match.end() + len(LINE_SEP)
+        # Each pair is followed by a line separator, or by the end of the list
+        if assignments_list[match.end() : line_start] not in (line_sep, line_sep[:0]):
+            raise ValueError(f"Malformed assignment at character {match.end()}")
+
+        start1, stop1, start2, stop2 = bounds = tuple(map(int, match.groups()))
+        if start1 > stop1 or start2 > stop2:
+            raise ValueError(f"Malformed WorkRange: {match.group()}")
+        yield bounds
+
+    if line_start != stop + len(LINE_SEP):
+        raise ValueError(f"Malformed assignment at character {line_start}")
+
+
+def _fully_overlapped(start1: int, stop1: int, start2: int, stop2: int) -> bool:
+    """Tells if one range of a pair fully contains the other."""
+    return (start1 <= start2 and stop1 >= stop2) or (
+        start2 <= start1 and stop2 >= stop1
+    )
+
+
+class OverlapCounts(NamedTuple):
+    """Number of pairs of elves for each kind of overlap."""
+
+    full: int  # one range fully contains the other
+    partial: int  # ranges overlap without full containment
+    disjoint: int  # ranges do not overlap at all
+
+
+def count_overlaps(assignments_list: str | Buffer | Iterable[str]) -> OverlapCounts:
+    """
+    Classify every pair of elves in a single pass.
+
+    The bounds are extracted by `iter_assignments` and compared directly, no
+    WorkRange is built.
+
+    Args:
+        assignments_list: text or bytes representing the work assignment of all elf
+            pair, a buffer like `mapped_input(path)`, or an iterable of lines
+
+    Returns:
+        number of full overlaps, partial overlaps and disjoint pairs
+
+    Raises:
+        ValueError: if the assignments list is malformed
+    """
+    full = partial = disjoint = 0
+    for start1, stop1, start2, stop2 in iter_assignments(assignments_list):
+        if start1 > stop2 or start2 > stop1:
+            disjoint += 1
+        elif (start1 <= start2 and stop1 >= stop2) or (
+            start2 <= start1 and stop2 >= stop1
+        ):
+            full += 1
+        else:
+            partial += 1
+
+    return OverlapCounts(full=full, partial=partial, disjoint=disjoint)
+
+
+def nb_overlap(
+    assignments_list: str | Buffer | Iterable[str] | WorkRangeBatch,
+) -> int:
     """
     Solve day 4 part 1 puzzle.
 
     Args:
-        assignments_list: string representing the work assignment of all elf pair
+        assignments_list: text or bytes representing the work assignment of all elf
+            pair, a buffer like `mapped_input(path)`, an iterable of lines, or an
+            already parsed batch of assignments
 
     Returns:
         number of full overlap
     """
-    return sum(is_overlapped(line) for line in assignments_list.split(LINE_SEP))
+    if isinstance(assignments_list, WorkRangeBatch):
+        return sum(assignments_list.fully_contains())
+
+    return count_overlaps(assignments_list).full
+
+
+@dataclass(frozen=True)
+class SectionIndex:
+    """
+    Index of the sections covered by the work assignments of all the pairs.
+
+    Every range is kept sorted by start and by stop, along with the coverage histogram
+    of the sections (built from a difference array), so that section coverage
+    questions are answered with binary searches instead of rescanning the pairs. The
+    most crowded section is found once, while building the index.
+    """
+
+    starts: array  # start of every range, sorted
+    start_stops: array  # stop of the ranges, in the order of `starts`
+    start_pairs: array  # pair index of the ranges, in the order of `starts`
+    stops: array  # stop of every range, sorted
+    stop_starts: array  # start of the ranges, in the order of `stops`
+    stop_pairs: array  # pair index of the ranges, in the order of `stops`
+    sections: array  # sections where the coverage changes, sorted
+    coverage: array  # number of elves assigned from each of `sections` to the next
+    crowded: int  # lowest section assigned to the most elves, 0 if there is none
+    crowd: int  # number of elves assigned to `crowded`
+    nb_full: int  # number of pairs where a range fully contains the other
+    nb_partial: int  # number of pairs overlapping without full containment
+
+    @classmethod
+    def from_bounds(
+        cls: type[Self], bounds: Iterable[tuple[int, int, int, int]]
+    ) -> Self:
+        """
+        Build the index from the bounds of each pair.
+
+        Args:
+            bounds: start and stop of the first elf, then start and stop of the second
+                elf, for each pair
+
+        Returns:
+            the index of the sections of all the pairs
+        """
+        ranges = []
+        nb_full = nb_partial = 0
+        for pair, (start1, stop1, start2, stop2) in enumerate(bounds):
+            ranges.append((start1, stop1, pair))
+            ranges.append((start2, stop2, pair))
+            if _fully_overlapped(start1, stop1, start2, stop2):
+                nb_full += 1
+            elif start1 <= stop2 and start2 <= stop1:
+                nb_partial += 1
+
+        by_start = sorted(ranges)
+        by_stop = sorted(ranges, key=lambda rng: (rng[1], rng[0], rng[2]))
+
+        deltas = Counter()
+        for start, stop, _ in ranges:
+            deltas[start] += 1
+            deltas[stop + 1] -= 1
+        sections = sorted(deltas)
+        coverage = array("q", accumulate(deltas[section] for section in sections))
+        crowd = max(coverage, default=0)
+        crowded = sections[coverage.index(crowd)] if coverage else 0
+
+        return cls(
+            starts=array("q", (rng[0] for rng in by_start)),
+            start_stops=array("q", (rng[1] for rng in by_start)),
+            start_pairs=array("q", (rng[2] for rng in by_start)),
+            stops=array("q", (rng[1] for rng in by_stop)),
+            stop_starts=array("q", (rng[0] for rng in by_stop)),
+            stop_pairs=array("q", (rng[2] for rng in by_stop)),
+            sections=array("q", sections),
+            coverage=coverage,
+            crowded=crowded,
+            crowd=crowd,
+            nb_full=nb_full,
+            nb_partial=nb_partial,
+        )
+
+    @classmethod
+    def from_pairs(
+        cls: type[Self], pairs: Iterable[tuple[WorkRange, WorkRange]]
+    ) -> Self:
+        """
+        Build the index from parsed pairs of WorkRange.
+
+        Args:
+            pairs: WorkRange object for each elves of each pair
+
+        Returns:
+            the index of the sections of all the pairs
+        """
+        return cls.from_bounds(
+            (first.start, first.stop, second.start, second.stop)
+            for first, second in pairs
+        )
+
+    @classmethod
+    def from_str(cls: type[Self], assignments_list: str | bytes) -> Self:
+        """
+        Build the index from a whole assignments list.
+
+        Args:
+            assignments_list: text or bytes representing the work assignment of all
+                elf pair
+
+        Returns:
+            the index of the sections of all the pairs
+
+        Raises:
+            ValueError: if the assignments list is malformed
+        """
+        return cls.from_bounds(iter_assignments(assignments_list))
+
+    def __len__(self: Self) -> int:
+        """Number of pairs in the index."""
+        return len(self.starts) // 2
+
+    @property
+    def nb_disjoint(self: Self) -> int:
+        """Number of pairs whose ranges do not overlap at all."""
+        return len(self) - self.nb_full - self.nb_partial
+
+    def nb_elves(self: Self, section: int) -> int:
+        """
+        Count the elves assigned to a section in O(log n).
+
+        Args:
+            section: the section to look at
+
+        Returns:
+            number of elves whose range contains the section
+        """
+        idx = bisect_right(self.sections, section) - 1
+        return self.coverage[idx] if idx >= 0 else 0
+
+    def nb_elves_between(self: Self, first: int, last: int) -> int:
+        """
+        Count the elves assigned to at least one section of a range in O(log n).
+
+        Args:
+            first: first section of the range
+            last: last section of the range
+
+        Returns:
+            number of elves whose range touches the range of sections
+        """
+        before = bisect_left(self.stops, first)
+        after = len(self.starts) - bisect_right(self.starts, last)
+        return len(self.starts) - before - after
+
+    def most_crowded(self: Self) -> tuple[int, int]:
+        """
+        Find the section assigned to the most elves in O(1).
+
+        Returns:
+            the lowest most crowded section and its number of elves
+
+        Raises:
+            ValueError: if the index is empty
+        """
+        if not self.coverage:
+            raise ValueError("No section in an empty index")
+
+        return self.crowded, self.crowd
+
+    def pairs_at(self: Self, section: int) -> list[int]:
+        """
+        Find the pairs with at least one elf assigned to a section.
+
+        Only the ranges starting before the section or stopping after it are
+        scanned, whichever are the fewest.
+
+        Args:
+            section: the section to look at
+
+        Returns:
+            sorted indexes of the pairs touching the section
+        """
+        nb_started = bisect_right(self.starts, section)
+        first_not_stopped = bisect_left(self.stops, section)
+        if nb_started <= len(self.stops) - first_not_stopped:
+            candidates = zip(
+                self.start_stops[:nb_started],
+                self.start_pairs[:nb_started],
+                strict=True,
+            )
+            pairs = {pair for stop, pair in candidates if stop >= section}
+        else:
+            candidates = zip(
+                self.stop_starts[first_not_stopped:],
+                self.stop_pairs[first_not_stopped:],
+                strict=True,
+            )
+            pairs = {pair for start, pair in candidates if start <= section}
+
+        return sorted(pairs)
+
+
+def solve(assignments_list: str | Buffer | Iterable[str], part: int = 1) -> int:
+    """
+    Answer a day 4 challenge question, without any rendering.
+
+    Args:
+        assignments_list: string representing the work assignment of all elf pair, a
+            buffer like `mapped_input(path)`, or an iterable of lines like a file
+            object or `iter_records(path)`
+        part: only part 1 is solved
+
+    Returns:
+        number of full overlap
+
+    Raises:
+        ValueError: if the part is not solved
+    """
+    if part != 1:
+        raise ValueError(f"Day 4 part {part} is not solved")
+
+    # Each pair is parsed and compared in the same pass
+    with stage("day04", "compute"):
+        return nb_overlap(assignments_list)
 
 
 def main():
     """Script to answer the question, with style."""
+    from rich.console import Console
+    from rich.markdown import Markdown
+
+    from pymaoc2022.cache import ResultCache, input_digest
+
     console = Console()
 
-    with (
-        open(INSTRUCTIONS / "day04_part1.md") as part_one,
-        open(BASE_DIRE / "pair_assignments.data") as assignments_f,
-    ):
-        assignments_list = assignments_f.read()
+    with mapped_input(DATA_FILE) as assignments_list:
+        with stage("day04", "read"):
+            digest = input_digest(assignments_list)
+
+        def compute() -> tuple[int]:
+            # The pairs are matched in place, in the memory map
+            with stage("day04", "compute"):
+                return (nb_overlap(assignments_list),)
+
+        (nb_full_overlap,) = ResultCache.default().answers(
+            solve, digest, PARTS, compute
+        )
+
+    with stage("day04", "render"), open(INSTRUCTIONS / "day04_part1.md") as part_one:
         console.print(Markdown(part_one.read()))
 
         console.print()
 
-        nb_full_overlap = nb_overlap(assignments_list)
-
         console.print(
             f"Number of assignment with full overlap: {nb_full_overlap}",
             justify="center",
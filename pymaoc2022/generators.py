@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""Generate large puzzle inputs, with their expected answers."""
+
+import argparse
+import heapq
+import json
+import random
+import string
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from pymaoc2022 import day01, day02, day03, day04
+
+DEFAULT_SEED = 2022
+WRITE_BUFFER = 1 << 20
+DRAW_CHUNK = 1 << 12  # rounds drawn at once, bounds the memory of huge guides
+
+
+def calorie_list(rng: random.Random, size: int, answers: dict) -> Iterator[str]:
+    """
+    Generate the inventory of each Elf.
+
+    Args:
+        rng: random generator to use
+        size: number of elves
+        answers: filled with the expected answers once all the elves are generated
+
+    Yields:
+        the calories of the snacks of one Elf, one per line
+    """
+    top3 = []  # (calories, -elf) of the 3 best elves
+    for elf in range(1, size + 1):
+        snacks = [rng.randint(1000, 60000) for _ in range(rng.randint(1, 10))]
+        if len(top3) < 3:
+            heapq.heappush(top3, (sum(snacks), -elf))
+        else:
+            heapq.heappushpop(top3, (sum(snacks), -elf))
+        yield day01.SNACK_SEP.join(map(str, snacks))
+
+    best = [[-elf, cal] for cal, elf in sorted(top3, reverse=True)]
+    answers.update(part1=best[0] if best else None, part2=best)
+
+
+def strategy_guide(rng: random.Random, size: int, answers: dict) -> Iterator[str]:
+    """
+    Generate the rounds of a strategy guide.
+
+    Args:
+        rng: random generator to use
+        size: number of rounds
+        answers: filled with the expected answers once all the rounds are generated
+
+    Yields:
+        one round
+    """
+    rounds = list(day02.score_table(part=1))
+    total1 = total2 = 0
+    # Drawing in chunks gives the same rounds as a single draw of all of them
+    for drawn in range(0, size, DRAW_CHUNK):
+        for fight in rng.choices(rounds, k=min(DRAW_CHUNK, size - drawn)):
+            total1 += day02.SCORE_TABLES[1][fight]
+            total2 += day02.SCORE_TABLES[2][fight]
+            yield fight
+
+    answers.update(part1=total1, part2=total2)
+
+
+def _rucksack_group(rng: random.Random) -> tuple[list[str], list[str], str]:
+    """Generate 3 rucksacks sharing only a badge, each with one misplaced item."""
+    badge, *others = rng.sample(string.ascii_letters, k=len(string.ascii_letters))
+    group = []
+    misplaced_items = []
+    for pool in (others[0:17], others[17:34], others[34:51]):
+        misplaced, *items = pool
+        half = rng.randint(2, 16)
+        left = rng.choices(items[:8], k=half - 2)
+        left.insert(rng.randrange(half - 1), misplaced)
+        left.insert(rng.randrange(half), badge)
+        right = rng.choices(items[8:], k=half - 1)
+        right.insert(rng.randrange(half), misplaced)
+        group.append("".join(left + right))
+        misplaced_items.append(misplaced)
+    return group, misplaced_items, badge
+
+
+def rucksack_list(rng: random.Random, size: int, answers: dict) -> Iterator[str]:
+    """
+    Generate rucksacks with exactly one misplaced item and one badge per group of 3.
+
+    Args:
+        rng: random generator to use
+        size: number of rucksacks, rounded up to a multiple of 3
+        answers: filled with the expected answers once all the rucksacks are generated
+
+    Yields:
+        the content of one rucksack
+    """
+    total1 = total2 = 0
+    for _ in range((size + 2) // 3):
+        group, misplaced_items, badge = _rucksack_group(rng)
+        total1 += sum(map(day03.priority, misplaced_items))
+        total2 += day03.priority(badge)
+        yield from group
+
+    answers.update(part1=total1, part2=total2)
+
+
+def assignments_list(rng: random.Random, size: int, answers: dict) -> Iterator[str]:
+    """
+    Generate the work assignments of pairs of elves.
+
+    Args:
+        rng: random generator to use
+        size: number of pairs
+        answers: filled with the expected answers once all the pairs are generated
+
+    Yields:
+        the assignments of one pair, as `a-b,c-d`
+    """
+    full = partial = disjoint = 0
+    for _ in range(size):
+        start1, stop1 = sorted(rng.choices(range(1, 100), k=2))
+        start2, stop2 = sorted(rng.choices(range(1, 100), k=2))
+        if start1 > stop2 or start2 > stop1:
+            disjoint += 1
+        elif (start1 <= start2 and stop1 >= stop2) or (
+            start2 <= start1 and stop2 >= stop1
+        ):
+            full += 1
+        else:
+            partial += 1
+        yield f"{start1}-{stop1},{start2}-{stop2}"
+
+    answers.update(part1=full, partial=partial, disjoint=disjoint)
+
+
+FORMATS: dict[str, tuple[Callable[[random.Random, int, dict], Iterator[str]], str]] = {
+    "day01": (calorie_list, day01.ELF_SEP),
+    "day02": (strategy_guide, day02.ROUND_SEP),
+    "day03": (rucksack_list, day03.BAG_SEP),
+    "day04": (assignments_list, day04.LINE_SEP),
+}
+
+
+def generate_text(day: str, size: int, seed: int = DEFAULT_SEED) -> str:
+    """
+    Generate a whole puzzle input in memory.
+
+    Args:
+        day: puzzle format, one of `FORMATS`
+        size: number of records
+        seed: seed of the random generator
+
+    Returns:
+        the puzzle input
+    """
+    records, sep = FORMATS[day]
+    return sep.join(records(random.Random(seed), size, {}))
+
+
+def write_input(day: str, path: Path, size: int, seed: int = DEFAULT_SEED) -> dict:
+    """
+    Stream a puzzle input to disk, with a constant memory footprint.
+
+    Args:
+        day: puzzle format, one of `FORMATS`
+        path: file to write
+        size: number of records
+        seed: seed of the random generator
+
+    Returns:
+        the expected answers for this input
+    """
+    records, sep = FORMATS[day]
+    answers = {}
+    with open(path, "w", buffering=WRITE_BUFFER) as out:
+        for idx, record in enumerate(records(random.Random(seed), size, answers)):
+            if idx:
+                out.write(sep)
+            out.write(record)
+
+    return answers
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Generate a puzzle input from the command line.
+
+    Args:
+        argv: command line arguments, defaults to `sys.argv`
+
+    Returns:
+        exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("day", choices=FORMATS, help="puzzle format")
+    parser.add_argument("output", type=Path, help="puzzle input file to write")
+    parser.add_argument("--size", type=int, required=True, help="number of records")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--expected", type=Path, help="JSON file for the answers")
+    args = parser.parse_args(argv)
+
+    answers = write_input(args.day, args.output, args.size, args.seed)
+    if args.expected:
+        args.expected.write_text(json.dumps(answers, indent=2) + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Measure the time and memory spent in each stage of the solvers.
+
+`cProfile` and `tracemalloc` are only imported once they are needed, to keep the
+import of the solvers cheap when the instrumentation is off.
+"""
+
+import atexit
+import os
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Self
+
+STAGES = ("read", "parse", "compute", "render")
+
+ENV_VAR = "PYMAOC_INSTRUMENT"  # JSON file written at exit
+MEMORY_ENV_VAR = "PYMAOC_INSTRUMENT_MEMORY"  # "1" to also trace allocations
+PROFILE_ENV_VAR = "PYMAOC_PROFILE_DIR"  # directory of the pstats dumps
+
+_OFF = nullcontext()
+
+
+@dataclass
+class StageStats:
+    """Accumulated measures of one stage."""
+
+    calls: int = 0
+    seconds: float = 0.0  # wall time
+    allocated: int = 0  # bytes allocated at the peak of the biggest call
+
+
+@dataclass
+class Recorder:
+    """
+    Measures of all the stages run while it is active.
+
+    Tracing allocations slows the solvers down, so it is off unless `memory` is set.
+    Stages may nest: the peak of an inner stage also counts for the outer one.
+    """
+
+    memory: bool = False
+    profile_dir: Path | None = None
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    profiles: list[str] = field(default_factory=list)
+    _peaks: list[int] = field(default_factory=list, repr=False)  # per open stage
+    _profiling: bool = field(default=False, repr=False)
+
+    @contextmanager
+    def stage(self: Self, name: str) -> Iterator[None]:
+        """
+        Measure one call of a stage.
+
+        Args:
+            name: name of the stage, like `day02.parse`
+
+        Yields:
+            nothing, the stage is measured when the block exits
+        """
+        stats = self.stages.setdefault(name, StageStats())
+        profiler = None
+        if self.profile_dir and not self._profiling:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            self._profiling = True
+        if self.memory:
+            import tracemalloc
+
+            start_memory, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+
+        start = perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            stats.seconds += perf_counter() - start
+            stats.calls += 1
+
+            if self.memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                stats.allocated = max(stats.allocated, peak - start_memory)
+
+            if profiler:
+                self._profiling = False
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                dump = self.profile_dir / f"{name}-{stats.calls:04d}.pstats"
+                profiler.dump_stats(dump)
+                self.profiles.append(str(dump))
+
+    def to_dict(self: Self) -> dict:
+        """
+        Export the measures.
+
+        Returns:
+            JSON-friendly measures of each stage and paths of the pstats dumps
+        """
+        return {
+            "stages": {name: asdict(stats) for name, stats in self.stages.items()},
+            "profiles": self.profiles,
+        }
+
+    def save(self: Self, path: Path):
+        """
+        Write the measures as JSON.
+
+        Args:
+            path: JSON file to write
+        """
+        import json
+
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def _recorder_from_env() -> Recorder | None:
+    """Enable the instrumentation of the whole process from the environment."""
+    if not (output := os.environ.get(ENV_VAR)):
+        return None
+
+    profile_dir = os.environ.get(PROFILE_ENV_VAR)
+    recorder = Recorder(
+        memory=os.environ.get(MEMORY_ENV_VAR) == "1",
+        profile_dir=Path(profile_dir) if profile_dir else None,
+    )
+    if recorder.memory:
+        import tracemalloc
+
+        tracemalloc.start()
+    atexit.register(recorder.save, Path(output))
+    return recorder
+
+
+_recorder: ContextVar[Recorder | None] = ContextVar(
+    "recorder", default=_recorder_from_env()
+)
+
+
+def get_recorder() -> Recorder | None:
+    """
+    Get the active recorder.
+
+    Returns:
+        the recorder measuring the stages, None if the instrumentation is off
+    """
+    return _recorder.get()
+
+
+def stage(day: str, name: str) -> AbstractContextManager[None]:
+    """
+    Measure a block as one call of a stage, if the instrumentation is on.
+
+    When it is off, a shared no-op context manager is returned, so hooks cost a
+    context variable lookup.
+
+    Args:
+        day: module running the stage, like "day02"
+        name: one of `STAGES`
+
+    Returns:
+        the context manager measuring the block
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return _OFF
+    return recorder.stage(f"{day}.{name}")
+
+
+@contextmanager
+def instrumentation(
+    *, memory: bool = False, profile_dir: Path | None = None
+) -> Iterator[Recorder]:
+    """
+    Measure all the stages run in a block.
+
+    Args:
+        memory: also trace the allocated bytes, which slows the solvers down
+        profile_dir: directory to dump the cProfile stats of each outermost stage call
+
+    Yields:
+        the recorder, holding the measures once the block exits
+    """
+    import tracemalloc
+
+    recorder = Recorder(memory=memory, profile_dir=profile_dir)
+    start_tracing = memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        if start_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,210 @@
+"""Read the records of a puzzle input lazily, whatever its source."""
+
+import codecs
+import io
+import mmap
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from itertools import repeat
+from typing import BinaryIO, TextIO
+
+CHUNK_SIZE = 1 << 16
+LINE_SEP = "\n"  # one record per line, like days 2, 3 and 4
+GROUP_SEP = "\n\n"  # records separated by a blank line, like day 1
+NEWLINE = ord("\n")
+
+Source = str | bytes | bytearray | memoryview | os.PathLike | BinaryIO | TextIO
+Buffer = bytes | bytearray | mmap.mmap
+BUFFER_TYPES = (bytes, bytearray, mmap.mmap)
+
+
+def iter_chunks(
+    source: Source | Iterable[str | bytes], chunk_size: int = CHUNK_SIZE
+) -> Iterator[str | bytes | memoryview]:
+    """
+    Read a puzzle input as a sequence of fixed-size chunks.
+
+    A string is always a path: wrap a whole input given as text in `io.StringIO`.
+
+    Args:
+        source: a path (read in binary), a file object opened in text or binary mode,
+            the whole input as bytes, or an iterable of consecutive chunks
+        chunk_size: maximum size of a chunk, except for an iterable of chunks
+
+    Yields:
+        consecutive chunks of the input, as text or as bytes-like objects
+    """
+    match source:
+        case str() | os.PathLike():
+            with open(source, "rb") as input_f:
+                yield from iter_chunks(input_f, chunk_size)
+        case bytes() | bytearray() | memoryview():
+            view = memoryview(source)
+            for start in range(0, len(view), chunk_size):
+                yield view[start : start + chunk_size]
+        case _ if hasattr(source, "read"):
+            yield from iter(lambda: source.read(chunk_size), source.read(0))
+        case _:
+            yield from source
+
+
+def iter_records(
+    source: Source | Iterable[str | bytes],
+    sep: str = LINE_SEP,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Split a puzzle input into records without loading it whole in memory.
+
+    Records may span several chunks, and so may their separator. Trailing newlines at
+    the end of the input are ignored, so an input ending with a newline gives the same
+    records as one that does not.
+
+    A string is always a path: wrap a whole input given as text in `io.StringIO`.
+
+    Args:
+        source: a path (read in binary), a file object opened in text or binary mode,
+            the whole input as bytes, or an iterable of consecutive chunks
+        sep: separator of the records, `LINE_SEP` or `GROUP_SEP`
+        chunk_size: size of the chunks, except for an iterable of chunks
+
+    Yields:
+        each record as text, without its separator
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    blanks = 0  # empty records are held back until we know they are not trailing
+    for chunk in iter_chunks(source, chunk_size):
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+
+        *records, pending = (pending + chunk).split(sep)
+        if not blanks and "" not in records:
+            yield from records
+            continue
+
+        for record in records:
+            if not record:
+                blanks += 1
+                continue
+            yield from [""] * blanks
+            blanks = 0
+            yield record
+
+    if last := (pending + decoder.decode(b"", final=True)).rstrip("\n"):
+        yield from [""] * blanks
+        yield last
+
+
+@contextmanager
+def mapped_input(path: str | os.PathLike) -> Iterator[Buffer]:
+    """
+    Map a puzzle input file in memory, read-only.
+
+    Nothing is read nor decoded up front: pages are loaded by the OS as the solvers
+    scan the buffer, so huge inputs only cost their page-cache footprint.
+
+    Args:
+        path: puzzle input file
+
+    Yields:
+        the memory map of the file, or empty bytes for an empty file
+    """
+    with open(path, "rb") as input_f:
+        if os.fstat(input_f.fileno()).st_size == 0:
+            # Empty files can not be mapped
+            yield b""
+            return
+
+        with mmap.mmap(input_f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield buffer
+
+
+def _drop_last(items: Iterable[bytes], count: int) -> Iterator[bytes]:
+    """Yield all the items but the last `count` ones."""
+    held = deque(maxlen=count + 1)
+    for item in items:
+        held.append(item)
+        if len(held) > count:
+            yield held.popleft()
+
+
+def content_stop(buffer: Buffer) -> int:
+    """
+    Find the end of the content of a buffer, before its trailing newlines.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+
+    Returns:
+        the size of the buffer without its trailing newlines
+    """
+    stop = len(buffer)
+    while stop and buffer[stop - 1] == NEWLINE:
+        stop -= 1
+    return stop
+
+
+def iter_buffer_records(buffer: Buffer, sep: str = LINE_SEP) -> Iterator[bytes]:
+    """
+    Split a buffer into records, copying one record at a time.
+
+    Lines are cut by `readline`, from the start of the buffer, so the position of a
+    memory map is moved. Trailing newlines at the end of the buffer are ignored, like
+    `iter_records` does.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator of the records, `LINE_SEP` or `GROUP_SEP`
+
+    Yields:
+        each record as bytes, without its separator
+    """
+    if not (stop := content_stop(buffer)):
+        return
+
+    if sep == LINE_SEP:
+        reader = buffer if isinstance(buffer, mmap.mmap) else io.BytesIO(buffer)
+        reader.seek(0)
+        lines = map(bytes.removesuffix, iter(reader.readline, b""), repeat(b"\n"))
+        # The first trailing newline ends the last line, the others are blank lines
+        nb_blanks = max(0, len(buffer) - stop - 1)
+        yield from _drop_last(lines, nb_blanks) if nb_blanks else lines
+        return
+
+    sep = sep.encode()
+    start = 0
+    while (end := buffer.find(sep, start, stop)) != -1:
+        yield buffer[start:end]
+        start = end + len(sep)
+    yield buffer[start:stop]
+
+
+def iter_lines(lines: Iterable[str | bytes]) -> Iterator[str]:
+    """
+    Normalise the lines of a puzzle input given as an iterable.
+
+    A file object opened in text or binary mode, `iter_records(path)` or a list of
+    lines all give the same lines: bytes are decoded and the newline ending each line,
+    if any, is removed.
+
+    Args:
+        lines: one line per item, like a file object
+
+    Yields:
+        each line as text, without its newline
+
+    Raises:
+        ValueError: if an item is not a single line, like a record of several lines
+    """
+    for idx, line in enumerate(lines, start=1):
+        if not isinstance(line, str):
+            line = bytes(line).decode()
+        line = line.removesuffix(LINE_SEP)
+        if LINE_SEP in line:
+            raise ValueError(f"Item {idx} is not a single line: {line!r}")
+        yield line
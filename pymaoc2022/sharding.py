@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+"""Solve one large puzzle input across a pool of processes, shard by shard."""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import reduce
+from itertools import accumulate
+from operator import add, attrgetter
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.day01 import ElfPackage
+from pymaoc2022.records import NEWLINE, Buffer, iter_buffer_records, mapped_input
+from pymaoc2022.validation import get_validation_mode, validation_mode
+
+MIN_SHARD_SIZE = 1 << 20
+MAX_SHARD_SIZE = 64 << 20
+SHARDS_PER_WORKER = 4  # more shards than workers balances uneven shards
+TOP_ELVES = 3
+
+
+@dataclass(frozen=True)
+class Reduction:
+    """
+    How a day is solved as an associative reduction over the shards of its input.
+
+    A shard is made of whole units: `group` consecutive records, each ended by `sep`.
+    The partial results of consecutive shards are merged left to right.
+    """
+
+    parts: Sequence[int]  # parts answered, like the `PARTS` of the day
+    sep: bytes  # separator ending each record
+    group: int  # number of records of a unit that must not be split
+    partial: Callable[[bytes], Any]  # partial result of one shard
+    combine: Callable[[Any, Any], Any]  # partial result of two consecutive shards
+    empty: Any  # partial result of an empty shard
+    answers: Callable[[Any], list]  # answer of each part from the whole result
+    restore: Callable[[Any], Any] = tuple  # partial result from its JSON form
+
+
+def _add_counts(left: Sequence[int], right: Sequence[int]) -> tuple[int, ...]:
+    """Merge partial sums or counts."""
+    return tuple(map(add, left, right))
+
+
+def _top_elves(shard: bytes) -> tuple[int, list[ElfPackage]]:
+    """Count the elves of a shard and keep the best ones, indexed from the shard."""
+    top = []  # (calories, -elf) of the best elves, the first elf wins the ties
+    nb_elves = 0
+    lines = iter_buffer_records(shard, day01.SNACK_SEP)
+    for nb_elves, cal in enumerate(day01.iter_elf_calories(lines), start=1):
+        if len(top) < TOP_ELVES:
+            heapq.heappush(top, (cal, -nb_elves))
+        else:
+            heapq.heappushpop(top, (cal, -nb_elves))
+
+    return nb_elves, [ElfPackage(elf=-elf, cal=cal) for cal, elf in sorted(top)[::-1]]
+
+
+def _restore_top_elves(result: list) -> tuple[int, list[ElfPackage]]:
+    """Rebuild the best elves of a partial result read back from JSON."""
+    nb_elves, top = result
+    return nb_elves, [ElfPackage(*pkg) for pkg in top]
+
+
+def _merge_top_elves(
+    left: tuple[int, list[ElfPackage]], right: tuple[int, list[ElfPackage]]
+) -> tuple[int, list[ElfPackage]]:
+    """Merge the best elves of two consecutive shards, shifting the right indexes."""
+    nb_left, top_left = left
+    nb_right, top_right = right
+    shifted = [ElfPackage(elf=pkg.elf + nb_left, cal=pkg.cal) for pkg in top_right]
+    # nlargest is stable, so the ties are still won by the first elf
+    top = heapq.nlargest(TOP_ELVES, top_left + shifted, key=attrgetter("cal"))
+    return nb_left + nb_right, top
+
+
+REDUCTIONS: dict[str, Reduction] = {
+    "day01": Reduction(
+        parts=day01.PARTS,
+        sep=day01.ELF_SEP.encode(),
+        group=1,
+        partial=_top_elves,
+        combine=_merge_top_elves,
+        empty=(0, []),
+        answers=lambda result: [result[1][0], result[1]],
+        restore=_restore_top_elves,
+    ),
+    "day02": Reduction(
+        parts=day02.PARTS,
+        sep=day02.ROUND_SEP.encode(),
+        group=1,
+        partial=day02.compute_both_scores,
+        combine=_add_counts,
+        empty=(0, 0),
+        answers=list,
+    ),
+    "day03": Reduction(
+        parts=day03.PARTS,
+        sep=day03.BAG_SEP.encode(),
+        group=3,
+        partial=day03.compute_both_priorities,
+        combine=_add_counts,
+        empty=(0, 0),
+        answers=list,
+    ),
+    "day04": Reduction(
+        parts=day04.PARTS,
+        sep=day04.LINE_SEP.encode(),
+        group=1,
+        partial=day04.count_overlaps,
+        combine=_add_counts,
+        empty=(0, 0, 0),
+        answers=lambda result: [result[0]],
+    ),
+}
+
+
+def record_start(buffer: Buffer, sep: bytes, offset: int) -> int:
+    """
+    Find the first record starting at or after an offset.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator ending each record
+        offset: position in the buffer
+
+    Returns:
+        the position right after the first separator ending at or after `offset`, 0
+        for offset 0, and the size of the buffer if there is none
+    """
+    if offset <= 0:
+        return 0
+
+    found = buffer.find(sep, max(offset - len(sep), 0))
+    if found == -1:
+        return len(buffer)
+
+    # In a run of separators, like "\n\n\n" for "\n\n", the first one ends the record
+    # and the rest belongs to the next one, since trailing newlines of a shard are lost
+    while found and buffer[found - 1 : found - 1 + len(sep)] == sep:
+        found -= 1
+    return found + len(sep)
+
+
+def skip_records(buffer: Buffer, sep: bytes, offset: int, count: int) -> int:
+    """
+    Move forward from the start of a record by a number of records.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator ending each record
+        offset: start of a record
+        count: number of records to skip
+
+    Returns:
+        the start of the record `count` records later, or the size of the buffer
+    """
+    for _ in range(count):
+        found = buffer.find(sep, offset)
+        if found == -1:
+            return len(buffer)
+        offset = found + len(sep)
+    return offset
+
+
+def shard_bounds(
+    buffer: Buffer,
+    sep: bytes,
+    shard_size: int,
+    start: int = 0,
+    stop: int | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Cut a range of a buffer into shards of whole records.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator ending each record
+        shard_size: approximate size of a shard in bytes
+        start: start of a record, where the range starts
+        stop: end of the range, defaults to the size of the buffer
+
+    Returns:
+        the start and stop of each non-empty shard, in order
+    """
+    stop = len(buffer) if stop is None else stop
+    offsets = {start, stop}
+    for offset in range(start + shard_size, stop, shard_size):
+        if start < (bound := record_start(buffer, sep, offset)) < stop:
+            offsets.add(bound)
+    offsets = sorted(offsets)
+    return list(zip(offsets, offsets[1:], strict=False))
+
+
+def regroup_bounds(
+    buffer: Buffer,
+    sep: bytes,
+    bounds: Sequence[tuple[int, int]],
+    counts: Iterable[int],
+    group: int,
+) -> list[tuple[int, int]]:
+    """
+    Move the shard bounds so that no group of records is split.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator ending each record
+        bounds: shards of whole records, as returned by `shard_bounds`
+        counts: number of separators in each shard
+        group: number of consecutive records of a group
+
+    Returns:
+        the start and stop of each non-empty shard of whole groups, in order
+    """
+    if not bounds:
+        return []
+
+    stop = bounds[-1][1]
+    offsets = {stop}
+    for (start, _), before in zip(bounds, accumulate(counts, initial=0), strict=False):
+        offsets.add(min(skip_records(buffer, sep, start, -before % group), stop))
+    offsets = sorted(offsets)
+    return list(zip(offsets, offsets[1:], strict=False))
+
+
+def count_records(buffer: Buffer, sep: bytes, start: int, stop: int) -> int:
+    """
+    Count the separators of a range, copying at most a shard at a time.
+
+    Args:
+        buffer: puzzle input, like a `mapped_input`
+        sep: separator ending each record, a single byte like `LINE_SEP`
+        start: start of the range
+        stop: end of the range
+
+    Returns:
+        the number of separators in the range
+    """
+    return sum(
+        buffer[offset : min(offset + MAX_SHARD_SIZE, stop)].count(sep)
+        for offset in range(start, stop, MAX_SHARD_SIZE)
+    )
+
+
+def _count_records(task: tuple[Path, bytes, int, int]) -> int:
+    """Count the separators of a shard, in a worker."""
+    path, sep, start, stop = task
+    with mapped_input(path) as buffer:
+        return count_records(buffer, sep, start, stop)
+
+
+def shard_partial(
+    day: str, buffer: Buffer, start: int, stop: int
+) -> Any:  # noqa: ANN401
+    """
+    Compute the partial result of a shard.
+
+    Only the shard is copied out of the buffer. Its trailing newlines are dropped,
+    like at the end of a puzzle input, so a shard of newlines gives an empty result.
+
+    Args:
+        day: one of `REDUCTIONS`
+        buffer: puzzle input, like a `mapped_input`
+        start: start of the shard, at the start of a unit of records
+        stop: end of the shard
+
+    Returns:
+        the partial result of the shard
+
+    Raises:
+        ValueError: if the shard is invalid
+    """
+    while stop > start and buffer[stop - 1] == NEWLINE:
+        stop -= 1
+    if stop == start:
+        return REDUCTIONS[day].empty
+    return REDUCTIONS[day].partial(buffer[start:stop])
+
+
+def _map_shard(task: tuple[str, Path, int, int, str]) -> Any:  # noqa: ANN401
+    """Compute the partial result of a shard, in a worker."""
+    day, path, start, stop, mode = task
+    with mapped_input(path) as buffer, validation_mode(mode):
+        return shard_partial(day, buffer, start, stop)
+
+
+def default_shard_size(size: int, workers: int) -> int:
+    """
+    Size the shards to keep all the workers busy with a bounded memory footprint.
+
+    Args:
+        size: size of the puzzle input in bytes
+        workers: number of processes
+
+    Returns:
+        the approximate size of a shard, in bytes
+    """
+    wanted = -(-size // (workers * SHARDS_PER_WORKER))
+    return max(MIN_SHARD_SIZE, min(MAX_SHARD_SIZE, wanted))
+
+
+def reduce_shards(
+    day: str,
+    path: str | os.PathLike,
+    start: int = 0,
+    stop: int | None = None,
+    workers: int | None = None,
+    shard_size: int | None = None,
+) -> tuple[Any, int]:
+    """
+    Compute the partial result of a range of a puzzle input, shard by shard.
+
+    Each worker maps the input file and solves its own byte range, so only the bounds
+    and the small partial results are sent between the processes. The validation
+    mode of the caller applies to all the workers.
+
+    Args:
+        day: one of `REDUCTIONS`
+        path: puzzle input file
+        start: start of a unit of records, where the range starts
+        stop: end of the range, defaults to the size of the file
+        workers: number of processes, defaults to the number of CPUs, 1 solves all
+            the shards in the current process
+        shard_size: approximate size of a shard in bytes, defaults to
+            `default_shard_size`
+
+    Returns:
+        the partial result of the range and its number of shards
+
+    Raises:
+        ValueError: if the day is unknown or the puzzle input is invalid
+    """
+    if day not in REDUCTIONS:
+        raise ValueError(f"Unknown day {day}, expected one of {tuple(REDUCTIONS)}")
+
+    reduction = REDUCTIONS[day]
+    workers = workers or os.cpu_count() or 1
+    mode = get_validation_mode()
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    with mapped_input(path) as buffer, pool or nullcontext():
+        run = pool.map if pool else map
+        stop = len(buffer) if stop is None else stop
+        shard_size = shard_size or default_shard_size(stop - start, workers)
+        bounds = shard_bounds(buffer, reduction.sep, shard_size, start, stop)
+        if reduction.group > 1:
+            # The groups are only known from the number of records before each shard
+            counts = run(_count_records, [(path, reduction.sep, *b) for b in bounds])
+            bounds = regroup_bounds(
+                buffer, reduction.sep, bounds, counts, reduction.group
+            )
+        partials = run(_map_shard, [(day, path, *bound, mode) for bound in bounds])
+        return reduce(reduction.combine, partials, reduction.empty), len(bounds)
+
+
+def part_answers(day: str, result: Any) -> dict:  # noqa: ANN401
+    """
+    Answer each part of a day from the partial result of its whole puzzle input.
+
+    Args:
+        day: one of `REDUCTIONS`
+        result: merged partial result of all the shards
+
+    Returns:
+        the answer of each part, as returned by `solve`, keyed like `part1`
+    """
+    reduction = REDUCTIONS[day]
+    return {
+        f"part{part}": answer
+        for part, answer in zip(reduction.parts, reduction.answers(result), strict=True)
+    }
+
+
+def solve_sharded(
+    day: str,
+    path: str | os.PathLike,
+    workers: int | None = None,
+    shard_size: int | None = None,
+) -> dict:
+    """
+    Solve all the parts of a day, sharding its puzzle input across processes.
+
+    Args:
+        day: one of `REDUCTIONS`
+        path: puzzle input file
+        workers: number of processes, defaults to the number of CPUs, 1 solves all
+            the shards in the current process
+        shard_size: approximate size of a shard in bytes, defaults to
+            `default_shard_size`
+
+    Returns:
+        the answer of each part, as returned by `solve`, the number of shards and of
+        workers and the time spent
+
+    Raises:
+        ValueError: if the day is unknown or the puzzle input is invalid
+    """
+    start = perf_counter()
+    result, nb_shards = reduce_shards(day, path, workers=workers, shard_size=shard_size)
+
+    return {
+        "day": day,
+        "input": str(path),
+        "answers": part_answers(day, result),
+        "shards": nb_shards,
+        "workers": workers or os.cpu_count() or 1,
+        "seconds": perf_counter() - start,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Solve a large puzzle input from the command line.
+
+    Args:
+        argv: command line arguments, defaults to `sys.argv`
+
+    Returns:
+        exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("day", choices=REDUCTIONS, help="puzzle format")
+    parser.add_argument("input", type=Path, help="puzzle input file")
+    parser.add_argument("--workers", type=int, help="number of processes")
+    parser.add_argument("--shard-size", type=int, help="approximate bytes per shard")
+    args = parser.parse_args(argv)
+
+    print(
+        json.dumps(
+            solve_sharded(args.day, args.input, args.workers, args.shard_size),
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Switch between strict and trusted validation of the puzzle inputs."""
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STRICT = "strict"  # every record is validated (default)
+TRUSTED = "trusted"  # only a cheap sanity check of the whole input is done
+MODES = (STRICT, TRUSTED)
+
+ENV_VAR = "PYMAOC_VALIDATION"
+
+
+def _check_mode(mode: str):
+    if mode not in MODES:
+        raise ValueError(f"Unknown validation mode: {mode}, expected one of {MODES}")
+
+
+def _environment_mode() -> str:
+    """Read the default mode from `$PYMAOC_VALIDATION`, rejecting unknown ones."""
+    mode = os.environ.get(ENV_VAR, STRICT)
+    _check_mode(mode)
+    return mode
+
+
+_mode: ContextVar[str] = ContextVar("validation_mode", default=_environment_mode())
+
+
+def get_validation_mode() -> str:
+    """
+    Get the current validation mode.
+
+    Returns:
+        `STRICT` or `TRUSTED`
+    """
+    return _mode.get()
+
+
+def is_trusted() -> bool:
+    """
+    Tell if the solvers can skip the per record validation.
+
+    Returns:
+        True if the current validation mode is `TRUSTED`
+    """
+    return _mode.get() == TRUSTED
+
+
+def set_validation_mode(mode: str):
+    """
+    Set the validation mode of all the solvers.
+
+    Args:
+        mode: `STRICT` or `TRUSTED`
+
+    Raises:
+        ValueError: if the mode is unknown
+    """
+    _check_mode(mode)
+    _mode.set(mode)
+
+
+@contextmanager
+def validation_mode(mode: str) -> Iterator[None]:
+    """
+    Use a validation mode for all the solvers called in a block.
+
+    Args:
+        mode: `STRICT` or `TRUSTED`
+
+    Yields:
+        nothing, the previous mode is restored when the block exits
+
+    Raises:
+        ValueError: if the mode is unknown
+    """
+    _check_mode(mode)
+    token = _mode.set(mode)
+    try:
+        yield
+    finally:
+        _mode.reset(token)
@@ -0,0 +1,121 @@
+"""Tests for the headless batch runner."""
+
+import json
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022.batch import main, parse_task, run_batch, run_task
+from pymaoc2022.cache import ResultCache
+
+SAMPLES = Path(__file__).parent
+TASKS = [
+    ("day01", SAMPLES / "calories_list_sample.data"),
+    ("day02", SAMPLES / "strategy_guide_sample.data"),
+    ("day03", SAMPLES / "rucksack_contents_sample.data"),
+    ("day04", SAMPLES / "pair_assignments_sample.data"),
+]
+ANSWERS = [
+    {"part1": (4, 24000), "part2": [(4, 24000), (3, 11000), (5, 10000)]},
+    {"part1": 15, "part2": 12},
+    {"part1": 157, "part2": 70},
+    {"part1": 2},
+]
+
+
+def test_parse_task():  # noqa: D103
+    assert_that(parse_task("day02=some/dir/input.data")).is_equal_to(
+        ("day02", Path("some/dir/input.data"))
+    )
+
+
+@pytest.mark.parametrize("task", ["day02", "day02=", "day42=input.data"])
+def test_parse_task_invalid(task: str):  # noqa: D103
+    assert_that(parse_task).raises(ValueError).when_called_with(task)
+
+
+@pytest.mark.parametrize(("task", "answers"), list(zip(TASKS, ANSWERS, strict=True)))
+def test_run_task(task: tuple[str, Path], answers: dict):  # noqa: D103
+    result = run_task(*task)
+
+    assert_that(result["error"]).is_none()
+    assert_that(result["answers"]).is_equal_to(answers)
+
+
+def test_run_task_error(tmp_path: Path):  # noqa: D103
+    result = run_task("day02", tmp_path / "missing.data")
+
+    assert_that(result["answers"]).is_empty()
+    assert_that(result["error"]).starts_with("FileNotFoundError")
+
+
+def test_run_task_odd_rucksack(tmp_path: Path):  # noqa: D103
+    (tmp_path / "rucksacks.data").write_text("abc\nab\nab\n")
+
+    result = run_task("day03", tmp_path / "rucksacks.data")
+
+    assert_that(result["answers"]).is_empty()
+    assert_that(result["error"]).starts_with("AssertionError")
+
+
+def test_run_batch_error(tmp_path: Path):  # noqa: D103
+    (tmp_path / "rucksacks.data").write_text("abc\nab\nab\n")
+
+    results = run_batch([("day03", tmp_path / "rucksacks.data"), TASKS[1]], 2)
+
+    assert_that(results["tasks"][0]["error"]).starts_with("AssertionError")
+    assert_that(results["tasks"][1]["answers"]).is_equal_to(ANSWERS[1])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(workers: int):  # noqa: D103
+    results = run_batch(TASKS * 2, workers)
+
+    assert_that(results["workers"]).is_equal_to(workers)
+    assert_that([result["answers"] for result in results["tasks"]]).is_equal_to(
+        ANSWERS * 2
+    )
+
+
+def test_run_batch_cached(tmp_path: Path):  # noqa: D103
+    cache = ResultCache(tmp_path / "cache")
+
+    first = run_batch(TASKS, 2, cache)
+    second = run_batch(TASKS, 2, cache)
+
+    assert_that(first["cache"]).is_equal_to({"hits": 0, "misses": 4})
+    assert_that(second["cache"]).is_equal_to({"hits": 7, "misses": 0})
+    assert_that([result["answers"] for result in second["tasks"]]).is_equal_to(
+        [
+            {"part1": [4, 24000], "part2": [[4, 24000], [3, 11000], [5, 10000]]},
+            *ANSWERS[1:],
+        ]
+    )
+
+
+def test_main(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):  # noqa: D103
+    monkeypatch.setenv("PYMAOC_CACHE_DIR", str(tmp_path / "cache"))
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(f"day04={TASKS[3][1]}\n")
+
+    status = main(
+        [
+            f"day02={TASKS[1][1]}",
+            f"day03={tmp_path / 'missing.data'}",
+            "--manifest",
+            str(manifest),
+            "--workers",
+            "1",
+            "--output",
+            str(tmp_path / "results.json"),
+        ]
+    )
+
+    results = json.loads((tmp_path / "results.json").read_text())
+    assert_that(status).is_equal_to(1)
+    assert_that([result["day"] for result in results["tasks"]]).is_equal_to(
+        ["day02", "day03", "day04"]
+    )
+    assert_that(results["tasks"][0]["answers"]).is_equal_to({"part1": 15, "part2": 12})
+    assert_that(results["tasks"][1]["error"]).is_not_none()
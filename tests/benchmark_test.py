@@ -0,0 +1,100 @@
+"""Tests for the benchmark suite."""
+
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022.benchmark import (
+    DAY_MODULES,
+    SOLVERS,
+    BenchResult,
+    bench_import,
+    bench_solver,
+    load,
+    main,
+    parse_import_times,
+    regressions,
+    save,
+)
+
+
+@pytest.mark.parametrize("solver", list(SOLVERS))
+def test_bench_solver(solver: str):  # noqa: D103
+    result = bench_solver(solver, size=30)
+
+    assert_that(result.solver).is_equal_to(solver)
+    assert_that(result.size).is_equal_to(30)
+    assert_that(result.records_per_s).is_positive()
+    assert_that(result.peak_memory).is_positive()
+
+
+def test_save_load(tmp_path: Path):  # noqa: D103
+    results = [BenchResult("nb_overlap", 1000, 0.5, 2000.0, 1024)]
+
+    save(results, tmp_path / "baseline.json")
+
+    assert_that(load(tmp_path / "baseline.json")).is_equal_to(results)
+
+
+def test_regressions():  # noqa: D103
+    baseline = [
+        BenchResult("nb_overlap", 1000, 1.0, 1000.0, 0),
+        BenchResult("nb_overlap", 10000, 10.0, 1000.0, 0),
+    ]
+    current = [
+        BenchResult("nb_overlap", 1000, 1.0, 850.0, 0),
+        BenchResult("nb_overlap", 10000, 10.0, 750.0, 0),
+        BenchResult("nb_overlap", 100000, 10.0, 10.0, 0),
+    ]
+
+    found = regressions(baseline, current, tolerance=0.2)
+
+    assert_that(found).is_equal_to([(baseline[1], current[1])])
+
+
+def test_main_compare(tmp_path: Path):  # noqa: D103
+    baseline = tmp_path / "baseline.json"
+    args = ["--solvers", "nb_overlap", "--sizes", "30"]
+
+    assert_that(main(["run", *args, "--output", str(baseline)])).is_equal_to(0)
+
+    save([BenchResult("nb_overlap", 30, 0.0, float("inf"), 0)], baseline)
+    assert_that(main(["compare", str(baseline), *args])).is_equal_to(1)
+
+
+@pytest.mark.parametrize("module", DAY_MODULES)
+def test_day_modules_import_no_heavy_module(module: str):  # noqa: D103
+    result = bench_import(module)
+
+    assert_that(result.seconds).is_positive()
+    assert_that(result.heavy).is_empty()
+
+
+def test_bench_import_finds_heavy_modules():  # noqa: D103
+    assert_that(bench_import("rich.console").heavy).is_equal_to(["rich"])
+
+
+def test_parse_import_times():  # noqa: D103
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:        95 |         95 |   _io",
+            "<string>:1: DeprecationWarning: a stray line | with | pipes",
+            "Traceback (most recent call last):",
+            "import time:       310 |        405 | pymaoc2022",
+        ]
+    )
+
+    assert_that(parse_import_times(stderr)).is_equal_to({"_io": 95, "pymaoc2022": 405})
+
+
+def test_bench_import_invalid():  # noqa: D103
+    assert_that(bench_import).raises(ValueError).when_called_with("pymaoc2022.day42")
+
+
+def test_main_imports():  # noqa: D103
+    assert_that(main(["imports", "--budget", "10"])).is_equal_to(0)
+    assert_that(
+        main(["imports", "--modules", "rich.console", "--budget", "10"])
+    ).is_equal_to(1)
@@ -0,0 +1,171 @@
+"""Tests for the on-disk result cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022 import day02
+from pymaoc2022.cache import ResultCache, default_directory, input_digest
+from pymaoc2022.validation import TRUSTED, validation_mode
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> ResultCache:  # noqa: D103
+    return ResultCache(tmp_path / "cache")
+
+
+def test_input_digest_of_path_and_bytes(tmp_path: Path):  # noqa: D103
+    (tmp_path / "input.data").write_bytes(b"A Y\nB X\nC Z")
+
+    assert_that(input_digest(tmp_path / "input.data")).is_equal_to(
+        input_digest(b"A Y\nB X\nC Z")
+    )
+    assert_that(input_digest(b"A Y\nB X\nC Z")).is_not_equal_to(
+        input_digest(b"A Y\nB X\nC X")
+    )
+
+
+def test_key_depends_on_input_solver_and_part(cache: ResultCache):  # noqa: D103
+    digest = input_digest(b"A Y")
+    keys = {
+        cache.key(digest, day02.solve, 1),
+        cache.key(digest, day02.solve, 2),
+        cache.key(digest, day02.compute_global_score, 1),
+        cache.key(input_digest(b"A Z"), day02.solve, 1),
+    }
+
+    assert_that(keys).is_length(4)
+
+
+def test_key_depends_on_validation_mode(cache: ResultCache):  # noqa: D103
+    digest = input_digest(b"A Y")
+    strict_key = cache.key(digest, day02.solve, 1)
+    with validation_mode(TRUSTED):
+        trusted_key = cache.key(digest, day02.solve, 1)
+
+    assert_that(trusted_key).is_not_equal_to(strict_key)
+
+
+def test_trusted_answers_not_served_to_strict_runs(  # noqa: D103
+    cache: ResultCache,
+):
+    digest = input_digest(b"malformed")
+    with validation_mode(TRUSTED):
+        cache.answers(day02.solve, digest, [1], lambda: [42])
+
+    assert_that(cache.answers(day02.solve, digest, [1], lambda: [0])).is_equal_to([0])
+    with validation_mode(TRUSTED):
+        assert_that(cache.answers(day02.solve, digest, [1], list)).is_equal_to([42])
+
+
+def test_get_put(cache: ResultCache):  # noqa: D103
+    assert_that(cache.get("key")).is_equal_to((False, None))
+
+    cache.put("key", [4, 24000])
+
+    assert_that(cache.get("key")).is_equal_to((True, [4, 24000]))
+    assert_that(cache.stats()).is_equal_to({"hits": 1, "misses": 1})
+
+
+def test_answers_computes_once(cache: ResultCache):  # noqa: D103
+    calls = []
+
+    def compute() -> tuple[int, int]:
+        calls.append(1)
+        return 15, 12
+
+    digest = input_digest(b"A Y\nB X\nC Z")
+    first = cache.answers(day02.solve, digest, day02.PARTS, compute)
+    second = cache.answers(day02.solve, digest, day02.PARTS, compute)
+
+    assert_that(first).is_equal_to([15, 12])
+    assert_that(second).is_equal_to([15, 12])
+    assert_that(calls).is_length(1)
+    assert_that(cache.stats()).is_equal_to({"hits": 2, "misses": 1})
+
+
+def test_disabled_cache_bypasses(cache: ResultCache):  # noqa: D103
+    cache.enabled = False
+    cache.put("key", 42)
+
+    assert_that(cache.get("key")).is_equal_to((False, None))
+    assert_that(cache.directory.exists()).is_false()
+
+
+def test_discard_and_clear(cache: ResultCache):  # noqa: D103
+    cache.put("key1", 1)
+    cache.put("key2", 2)
+
+    assert_that(cache.discard("key1")).is_true()
+    assert_that(cache.discard("key1")).is_false()
+    assert_that(cache.get("key2")).is_equal_to((True, 2))
+
+    cache.clear()
+
+    assert_that(cache.get("key2")).is_equal_to((False, None))
+
+
+def test_evicts_least_recently_used(cache: ResultCache):  # noqa: D103
+    cache.max_bytes = 3 * len("1000")
+    for idx, key in enumerate(["old", "used", "new"]):
+        cache.put(key, 1000 + idx)
+        os.utime(cache.directory / f"{key}.json", (idx, idx))
+    cache.get("used")  # now the most recently used
+
+    cache.put("newest", 1003)
+
+    assert_that(cache.get("old")).is_equal_to((False, None))
+    for key in ["used", "new", "newest"]:
+        assert_that(cache.get(key)[0]).is_true()
+
+
+def test_no_leftover_temporary_file(cache: ResultCache):  # noqa: D103
+    cache.put("key", {"part1": 1})
+
+    assert_that([path.name for path in cache.directory.iterdir()]).is_equal_to(
+        ["key.json"]
+    )
+
+
+def test_no_leftover_temporary_file_on_error(  # noqa: D103
+    cache: ResultCache, monkeypatch: pytest.MonkeyPatch
+):
+    def replace(*_: str):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace)
+
+    assert_that(cache.put).raises(OSError).when_called_with("key", {"part1": 1})
+    assert_that(list(cache.directory.iterdir())).is_empty()
+    assert_that(cache.put).raises(TypeError).when_called_with("key", {1, 2})
+    assert_that(list(cache.directory.iterdir())).is_empty()
+
+
+def test_scans_only_beyond_max_bytes(  # noqa: D103
+    cache: ResultCache, monkeypatch: pytest.MonkeyPatch
+):
+    cache.max_bytes = 3 * len("1000")
+    cache.put("first", 1000)  # the first write scans the existing entries
+    scans = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append(evict()))
+
+    cache.put("second", 1001)
+    cache.put("third", 1002)
+    assert_that(scans).is_empty()
+
+    cache.put("fourth", 1003)
+    assert_that(scans).is_length(1)
+    assert_that(cache.get("first")[0]).is_false()
+
+
+def test_default_from_environment(  # noqa: D103
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("PYMAOC_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PYMAOC_CACHE", "off")
+
+    assert_that(default_directory()).is_equal_to(tmp_path)
+    assert_that(ResultCache.default().enabled).is_false()
@@ -0,0 +1,249 @@
+"""Tests for the incremental solver and its checkpoints."""
+
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022 import checkpoint as checkpoint_module
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.checkpoint import (
+    Checkpoint,
+    complete_stop,
+    default_checkpoint,
+    file_identity,
+    main,
+    sampled_digest,
+    solve_incremental,
+)
+from pymaoc2022.generators import generate_text
+
+DAYS = [day01, day02, day03, day04]
+
+
+def _expected(module: ModuleType, text: bytes) -> dict:
+    text = text.rstrip(b"\n")
+    return {f"part{part}": module.solve(text, part) for part in module.PARTS}
+
+
+@pytest.mark.parametrize(
+    ("day", "text", "start", "expected"),
+    [
+        ("day02", b"A Y\nB X\nC", 0, 8),
+        ("day02", b"A Y\nB X\n", 0, 8),
+        ("day02", b"A Y", 0, 0),
+        ("day02", b"A Y\nB X\nC", 4, 8),
+        ("day01", b"1\n2\n\n3\n4", 0, 5),
+        ("day01", b"1\n\n\n\n3", 0, 3),
+        ("day01", b"1\n2\n", 0, 0),
+        ("day03", b"a\nb\nc\nd\ne", 0, 6),
+        ("day03", b"a\nb\nc\nd\ne\nf\n", 0, 12),
+        ("day03", b"a\nb\nc\nd\ne\nf\ng\nh\ni", 6, 12),
+    ],
+)
+def test_complete_stop(day: str, text: bytes, start: int, expected: int):  # noqa: D103
+    assert_that(complete_stop(text, day, start)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize("module", DAYS)
+@pytest.mark.parametrize("step", [1, 5, 50])
+def test_solve_incremental_appends(  # noqa: D103
+    tmp_path: Path, module: ModuleType, step: int
+):
+    day = module.__name__.rpartition(".")[2]
+    text = generate_text(day, 15).encode() + b"\n"
+    path = tmp_path / f"{day}.data"
+    path.write_bytes(b"")
+    checkpoint = tmp_path / "checkpoint.json"
+
+    # Only the states where the input is valid are compared
+    for cut in range(step, len(text) + step, step):
+        path.write_bytes(text[:cut])
+        try:
+            expected = _expected(module, text[:cut])
+        except (ValueError, IndexError, AssertionError):
+            continue
+
+        result = solve_incremental(day, path, checkpoint)
+
+        assert_that(result["answers"]).is_equal_to(expected)
+        assert_that(result["checkpoint"]).is_less_than_or_equal_to(cut)
+
+
+def test_solve_incremental_resumes(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "calories.data"
+    checkpoint = tmp_path / "checkpoint.json"
+    path.write_text("1000\n2000\n\n3000\n\n40")
+
+    first = solve_incremental("day01", path, checkpoint)
+    with open(path, "a") as input_f:
+        input_f.write("00\n\n500\n")
+    second = solve_incremental("day01", path, checkpoint)
+
+    assert_that(first["resumed"]).is_zero()
+    assert_that(first["checkpoint"]).is_equal_to(len("1000\n2000\n\n3000\n\n"))
+    assert_that(first["answers"]["part1"]).is_equal_to((1, 3000))
+    assert_that(second["resumed"]).is_equal_to(first["checkpoint"])
+    assert_that(second["answers"]["part2"]).is_equal_to(
+        [(3, 4000), (1, 3000), (2, 3000)]
+    )
+
+
+@pytest.mark.parametrize(
+    "rewritten",
+    ["A Y\n", "B X\nB X\nC Z\nA Y\n", "A Y\nB X\nC Z\n" + "A Y\n" * 1000],
+    ids=["truncated", "rewritten-head", "appended"],
+)
+def test_solve_incremental_rewritten(tmp_path: Path, rewritten: str):  # noqa: D103
+    path = tmp_path / "guide.data"
+    checkpoint = tmp_path / "checkpoint.json"
+    path.write_text("A Y\nB X\nC Z\n")
+    solve_incremental("day02", path, checkpoint)
+
+    path.write_text(rewritten)
+    result = solve_incremental("day02", path, checkpoint)
+
+    assert_that(result["answers"]).is_equal_to(_expected(day02, rewritten.encode()))
+    assert_that(result["resumed"]).is_equal_to(
+        12 if rewritten.startswith("A Y\nB") else 0
+    )
+
+
+def test_solve_incremental_edited_mid_file(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "guide.data"
+    checkpoint = tmp_path / "checkpoint.json"
+    path.write_text("A Y\n" * 20 + "B X\n" + "A Y\n" * 20)
+    solve_incremental("day02", path, checkpoint)
+
+    # Same size and same inode
+    with open(path, "r+b") as input_f:
+        input_f.seek(80)
+        input_f.write(b"C Z\n")
+    result = solve_incremental("day02", path, checkpoint)
+
+    assert_that(result["resumed"]).is_zero()
+    assert_that(result["answers"]).is_equal_to(_expected(day02, path.read_bytes()))
+
+
+def test_solve_incremental_replaced_file(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "guide.data"
+    checkpoint = tmp_path / "checkpoint.json"
+    path.write_text("A Y\nB X\nC Z\n")
+    solve_incremental("day02", path, checkpoint)
+
+    replacement = tmp_path / "replacement.data"
+    replacement.write_text("A Y\nB X\nC Z\nA Y\n")
+    os.replace(replacement, path)
+    result = solve_incremental("day02", path, checkpoint)
+
+    assert_that(result["resumed"]).is_zero()
+    assert_that(result["answers"]).is_equal_to({"part1": 23, "part2": 16})
+
+
+class _CountingBuffer(bytes):
+    """Bytes counting how many of them are copied out."""
+
+    copied = 0
+
+    def __getitem__(self: "_CountingBuffer", key: slice) -> bytes:
+        data = super().__getitem__(key)
+        _CountingBuffer.copied += len(data)
+        return data
+
+
+def test_sampled_digest(monkeypatch: pytest.MonkeyPatch):  # noqa: D103
+    expected = sampled_digest(b"A Y\nB X\nC Z\n", 8)
+
+    assert_that(sampled_digest(b"A Y\nB X\n", 8)).is_equal_to(expected)
+    assert_that(sampled_digest(b"A Y\nC Z\n", 8)).is_not_equal_to(expected)
+
+    monkeypatch.setattr(checkpoint_module, "BLOCK_SIZE", 4)
+    monkeypatch.setattr(checkpoint_module, "NB_BLOCKS", 3)
+    text = b"A Y\n" * 100
+    expected = sampled_digest(text, 400)
+    # The blocks start at 0, 198 and 396
+    assert_that(sampled_digest(text[:100] + b"B X\n" + text[104:], 400)).is_equal_to(
+        expected
+    )
+    assert_that(
+        sampled_digest(text[:196] + b"B X\n" + text[200:], 400)
+    ).is_not_equal_to(expected)
+
+
+def test_sampled_digest_is_bounded(monkeypatch: pytest.MonkeyPatch):  # noqa: D103
+    monkeypatch.setattr(_CountingBuffer, "copied", 0)
+    sampled_digest(_CountingBuffer(b"A Y\n" * (1 << 20)), 4 << 20)
+
+    assert_that(_CountingBuffer.copied).is_equal_to(
+        checkpoint_module.NB_BLOCKS * checkpoint_module.BLOCK_SIZE
+    )
+
+
+def test_checkpoint_of_another_day(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "guide.data"
+    checkpoint = tmp_path / "checkpoint.json"
+    path.write_text("1-2,3-4\n5-6,7-8\n")
+    Checkpoint.create("day02", path, path.read_bytes(), 16, (1, 2)).save(checkpoint)
+
+    result = solve_incremental("day04", path, checkpoint)
+
+    assert_that(result["resumed"]).is_zero()
+    assert_that(result["answers"]).is_equal_to({"part1": 0})
+
+
+def test_checkpoint_load_invalid(tmp_path: Path):  # noqa: D103
+    checkpoint = tmp_path / "checkpoint.json"
+
+    assert_that(Checkpoint.load(checkpoint)).is_none()
+    checkpoint.write_text("{not json")
+    assert_that(Checkpoint.load(checkpoint)).is_none()
+    checkpoint.write_text(json.dumps({"day": "day02"}))
+    assert_that(Checkpoint.load(checkpoint)).is_none()
+
+
+def test_checkpoint_round_trip(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "guide.data"
+    path.write_text("A Y\nB X\n")
+    checkpoint = tmp_path / "sub" / "checkpoint.json"
+    saved = Checkpoint.create("day02", path, path.read_bytes(), 8, (9, 5))
+    saved.save(checkpoint)
+
+    assert_that(Checkpoint.load(checkpoint)).is_equal_to(
+        Checkpoint("day02", 8, *file_identity(path), saved.digest, [9, 5])
+    )
+
+
+def test_default_checkpoint(  # noqa: D103
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("PYMAOC_CACHE_DIR", str(tmp_path))
+
+    assert_that(str(default_checkpoint("day02", "input.data"))).starts_with(
+        str(tmp_path / "checkpoints" / "day02-")
+    )
+    assert_that(default_checkpoint("day02", "input.data")).is_not_equal_to(
+        default_checkpoint("day02", "other.data")
+    )
+
+
+def test_main(  # noqa: D103
+    tmp_path: Path, capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("PYMAOC_CACHE_DIR", str(tmp_path))
+    path = tmp_path / "guide.data"
+    path.write_text("A Y\nB X\nC Z\n")
+
+    results = []
+    for argv in (
+        ["day02", str(path)],
+        ["day02", str(path)],
+        ["day02", str(path), "--reset"],
+    ):
+        assert_that(main(argv)).is_zero()
+        results.append(json.loads(capsys.readouterr().out))
+
+    assert_that([result["resumed"] for result in results]).is_equal_to([0, 12, 0])
+    assert_that(results[-1]["answers"]).is_equal_to({"part1": 15, "part2": 12})
@@ -2,9 +2,22 @@
 
 from pathlib import Path
 
+import pytest
 from assertpy import assert_that, soft_assertions
 
-from pymaoc2022.day01 import most_calorie_elf, most_calorie_elves
+from pymaoc2022.day01 import (
+    CalorieIndex,
+    ElfPackage,
+    elf_calories_array,
+    iter_elf_calories,
+    mapped_lines,
+    most_calorie_elf,
+    most_calorie_elves,
+    solve,
+    top_calorie_elves,
+    top_elves_array,
+)
+from pymaoc2022.records import iter_buffer_records
 
 TEST_DIR = Path(__file__).parent
 
@@ -30,3 +43,196 @@ def test_most_calorie_three_elves():  # noqa: D103
         assert_that(result[1].cal).is_equal_to(11000)
         assert_that(result[2].elf).is_equal_to(5)
         assert_that(result[2].cal).is_equal_to(10000)
+
+
+def test_iter_elf_calories():  # noqa: D103
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        totals = list(iter_elf_calories(cal_list))
+
+    assert_that(totals).is_equal_to([6000, 4000, 11000, 24000, 10000])
+
+
+@pytest.mark.parametrize("n", [1, 3, 5, 10])
+def test_top_calorie_elves(n: int):  # noqa: D103
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        calorie_list = cal_list.read()
+
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        result = top_calorie_elves(cal_list, n=n)
+
+    assert_that(result).is_equal_to(most_calorie_elves(calorie_list)[:n])
+
+
+def test_top_calorie_elves_ties():  # noqa: D103
+    result = top_calorie_elves("10\n\n5\n5\n\n3\n\n7\n3".split("\n"), n=3)
+
+    assert_that(result).is_equal_to(
+        [
+            ElfPackage(elf=1, cal=10),
+            ElfPackage(elf=2, cal=10),
+            ElfPackage(elf=4, cal=10),
+        ]
+    )
+
+
+def test_mapped_lines():  # noqa: D103
+    with open(TEST_DIR / "calories_list_sample.data", "rb") as cal_list:
+        expected = cal_list.readlines()
+
+    lines = list(mapped_lines(TEST_DIR / "calories_list_sample.data"))
+
+    assert_that(lines).is_equal_to(expected)
+
+
+def test_mapped_lines_empty_file(tmp_path: Path):  # noqa: D103
+    empty = tmp_path / "empty.data"
+    empty.touch()
+
+    assert_that(list(mapped_lines(empty))).is_empty()
+
+
+def test_top_calorie_elves_mapped():  # noqa: D103
+    result = top_calorie_elves(mapped_lines(TEST_DIR / "calories_list_sample.data"))
+
+    assert_that(result).is_equal_to(
+        [
+            ElfPackage(elf=4, cal=24000),
+            ElfPackage(elf=3, cal=11000),
+            ElfPackage(elf=5, cal=10000),
+        ]
+    )
+
+
+def test_elf_calories_array():  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        totals = elf_calories_array(cal_list.read())
+
+    assert_that(totals.tolist()).is_equal_to([6000, 4000, 11000, 24000, 10000])
+
+
+def test_elf_calories_array_malformed():  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        elf_calories_array("1000\n2000 3000\n\n4000")
+
+
+@pytest.mark.parametrize(
+    "calorie_list", ["1\n\n\n2", "\n1\n\n2", "1\n2\n\n\n\n3\n", "1\n\n\n"]
+)
+def test_elf_calories_array_empty_elves(calorie_list: str):  # noqa: D103
+    pytest.importorskip("numpy")
+
+    assert_that(elf_calories_array(calorie_list).tolist()).is_equal_to(
+        list(iter_elf_calories(iter_buffer_records(calorie_list.encode())))
+    )
+
+
+@pytest.mark.parametrize("n", [1, 3, 5, 10])
+def test_top_elves_array(n: int):  # noqa: D103
+    pytest.importorskip("numpy")
+
+    calorie_list = "10\n\n5\n5\n\n3\n\n7\n3\n\n12"
+
+    result = top_elves_array(elf_calories_array(calorie_list), n=n)
+
+    assert_that(result).is_equal_to(most_calorie_elves(calorie_list)[:n])
+
+
+def test_numpy_backend():  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        calorie_list = cal_list.read()
+
+    with soft_assertions():
+        assert_that(most_calorie_elf(calorie_list, backend="numpy")).is_equal_to(
+            most_calorie_elf(calorie_list)
+        )
+        assert_that(most_calorie_elves(calorie_list, backend="numpy")).is_equal_to(
+            most_calorie_elves(calorie_list)
+        )
+
+
+def test_most_calorie_elves_of_lines():  # noqa: D103
+    calorie_list = (TEST_DIR / "calories_list_sample.data").read_text()
+    lines = iter(calorie_list.splitlines())
+
+    assert_that(most_calorie_elves(lines)).is_equal_to(most_calorie_elves(calorie_list))
+
+
+@pytest.mark.parametrize("mode", ["r", "rb"])
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_file_object(mode: str, backend: str):  # noqa: D103
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "calories_list_sample.data", mode) as cal_list:
+        assert_that(most_calorie_elf(cal_list, backend)).is_equal_to((4, 24000))
+    with open(TEST_DIR / "calories_list_sample.data", mode) as cal_list:
+        assert_that(solve(cal_list, part=2)).is_equal_to(
+            [(4, 24000), (3, 11000), (5, 10000)]
+        )
+
+
+def test_elf_records_are_not_lines():  # noqa: D103
+    records = ["1000\n2000", "3000"]
+
+    assert_that(most_calorie_elf).raises(ValueError).when_called_with(records)
+
+
+def test_unknown_backend():  # noqa: D103
+    with pytest.raises(ValueError):
+        most_calorie_elves("1000", backend="fortran")
+
+
+@pytest.fixture
+def calorie_index() -> CalorieIndex:  # noqa: D103
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        return CalorieIndex.from_str(cal_list.read())
+
+
+def test_calorie_index_top(calorie_index: CalorieIndex):  # noqa: D103
+    with open(TEST_DIR / "calories_list_sample.data") as cal_list:
+        expected = most_calorie_elves(cal_list.read())
+
+    assert_that(calorie_index).is_length(5)
+    assert_that(calorie_index.top(n=5)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "elf, rank, calories", [(1, 4, 6000), (2, 5, 4000), (3, 2, 11000), (4, 1, 24000)]
+)
+def test_calorie_index_rank(  # noqa: D103
+    calorie_index: CalorieIndex, elf: int, rank: int, calories: int
+):
+    with soft_assertions():
+        assert_that(calorie_index.rank(elf)).is_equal_to(rank)
+        assert_that(calorie_index.calories(elf)).is_equal_to(calories)
+
+
+@pytest.mark.parametrize("elf", [0, 6])
+def test_calorie_index_unknown_elf(calorie_index: CalorieIndex, elf: int):  # noqa: D103
+    with pytest.raises(ValueError):
+        calorie_index.rank(elf)
+
+
+@pytest.mark.parametrize(
+    "percent, calories",
+    [(0, 4000), (20, 4000), (40, 6000), (50, 10000), (80, 11000), (100, 24000)],
+)
+def test_calorie_index_percentile(  # noqa: D103
+    calorie_index: CalorieIndex, percent: float, calories: int
+):
+    assert_that(calorie_index.percentile(percent)).is_equal_to(calories)
+
+
+@pytest.mark.parametrize(
+    "threshold, count", [(0, 5), (4000, 4), (10000, 2), (10999, 2), (24000, 0)]
+)
+def test_calorie_index_count_above(  # noqa: D103
+    calorie_index: CalorieIndex, threshold: int, count: int
+):
+    assert_that(calorie_index.count_above(threshold)).is_equal_to(count)
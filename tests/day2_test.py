@@ -9,8 +9,15 @@ from pymaoc2022.day02 import (
     ElfShape,
     MyShape,
     compute_all_scores,
+    compute_both_scores,
     compute_global_score,
+    compute_one_score,
+    iter_scores,
     outcome_score,
+    round_histogram,
+    running_scores,
+    score_histogram,
+    score_table,
     shape_score,
 )
 
@@ -86,3 +93,80 @@ def test_compute_global_score_part_2():  # noqa: D103
     with open(TEST_DIR / "strategy_guide_sample.data") as strat:
         score = compute_global_score(strat.read(), part=2)
         assert_that(score).is_equal_to(12)
+
+
+@pytest.mark.parametrize("part", [1, 2])
+def test_score_table(part: int):  # noqa: D103
+    table = score_table(part)
+
+    assert_that(table).is_length(9)
+    for fight, score in table.items():
+        assert_that(score).is_equal_to(compute_one_score(fight, part))
+
+
+@pytest.mark.parametrize("part", [1, 2])
+def test_compute_global_score_unknown_round(part: int):  # noqa: D103
+    with pytest.raises(ValueError):
+        compute_global_score("A Y\nD X\nC Z", part)
+
+
+def test_round_histogram():  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data", "rb") as strat:
+        histogram = round_histogram(strat.read())
+
+    assert_that(histogram).is_equal_to({"A Y": 1, "B X": 1, "C Z": 1})
+
+
+@pytest.mark.parametrize("part, expected", [(1, 15), (2, 12)])
+def test_score_histogram(part: int, expected: int):  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data") as strat:
+        histogram = round_histogram(strat.read())
+
+    assert_that(score_histogram(histogram, part)).is_equal_to(expected)
+
+
+def test_score_histogram_custom_table():  # noqa: D103
+    histogram = round_histogram("A Y\nA Y\nC Z")
+
+    assert_that(score_histogram(histogram, table={"A Y": 10, "C Z": 1})).is_equal_to(21)
+
+
+def test_compute_both_scores():  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data") as strat:
+        scores = compute_both_scores(strat.read())
+
+    assert_that(scores).is_equal_to((15, 12))
+
+
+@pytest.mark.parametrize("mode", ["r", "rb"])
+def test_compute_both_scores_file(mode: str):  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data", mode) as strat:
+        assert_that(compute_both_scores(strat)).is_equal_to((15, 12))
+
+    with open(TEST_DIR / "strategy_guide_sample.data", mode) as strat:
+        assert_that(round_histogram(strat)).is_equal_to({"A Y": 1, "B X": 1, "C Z": 1})
+
+
+@pytest.mark.parametrize("part, expected", [(1, [8, 1, 6]), (2, [4, 1, 7])])
+def test_iter_scores_file(part: int, expected: list[int]):  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data") as strat:
+        assert_that(list(iter_scores(strat, part))).is_equal_to(expected)
+
+
+@pytest.mark.parametrize("part, expected", [(1, 15), (2, 12)])
+def test_compute_global_score_file(part: int, expected: int):  # noqa: D103
+    with open(TEST_DIR / "strategy_guide_sample.data") as strat:
+        assert_that(compute_global_score(strat, part)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "window, expected",
+    [(None, [8, 9, 15, 17]), (1, [8, 1, 6, 2]), (2, [8, 9, 7, 8]), (5, [8, 9, 15, 17])],
+)
+def test_running_scores(window: int | None, expected: list[int]):  # noqa: D103
+    assert_that(list(running_scores([8, 1, 6, 2], window))).is_equal_to(expected)
+
+
+def test_running_scores_bad_window():  # noqa: D103
+    with pytest.raises(ValueError):
+        list(running_scores([8, 1, 6], window=0))
@@ -9,13 +9,22 @@ from pymaoc2022.day03 import (
     all_badges_priorities,
     all_misplaced_priorities,
     badge_item,
+    badge_mask,
+    badges_priorities_array,
+    check_rucksack_list,
+    compute_both_priorities,
     compute_total_priorities,
+    item_mask,
+    mask_items,
     misplaced_item,
+    misplaced_mask,
+    misplaced_priorities_array,
     one_badge_priority,
     one_misplaced_priority,
     priority,
     split_in_half,
 )
+from pymaoc2022.validation import TRUSTED, validation_mode
 
 TEST_DIR = Path(__file__).parent
 
@@ -137,3 +146,187 @@ def test_compute_total_priorities_part2():  # noqa: D103
         total = compute_total_priorities(rucksacks, part=2)
 
         assert_that(total).is_equal_to(70)
+
+
+@pytest.mark.parametrize(
+    "items, mask",
+    # cSpell:disable
+    [("", 0), ("a", 1), ("b", 2), ("aab", 3), ("Z", 1 << 51), ("zA", 3 << 25)],
+    # cSpell:enable
+)
+def test_item_mask(items: str, mask: int):  # noqa: D103
+    assert_that(item_mask(items)).is_equal_to(mask)
+    assert_that(mask_items(mask)).is_equal_to("".join(sorted({*items}, key=priority)))
+
+
+def test_item_mask_not_a_letter():  # noqa: D103
+    with pytest.raises(ValueError):
+        item_mask("ab1")
+
+
+@pytest.mark.parametrize(
+    "rucksack, priority",
+    # cSpell:disable
+    [("abczdefz", 26), ("ABCZDEFZ", 52), ("XaaabbbXcccddd", 50)],
+    # cSpell:enable
+)
+def test_misplaced_mask(rucksack: str, priority: int):  # noqa: D103
+    assert_that(misplaced_mask(rucksack).bit_length()).is_equal_to(priority)
+
+
+# cSpell:disable
+@pytest.mark.parametrize("rucksack", ["abcdef", "abcabc"])
+# cSpell:enable
+def test_misplaced_mask_invalid(rucksack: str):  # noqa: D103
+    with pytest.raises(ValueError):
+        misplaced_mask(rucksack)
+
+
+@pytest.mark.parametrize(
+    "group, priority",
+    # cSpell:disable
+    [(["Zabc", "deZfg", "hijklZ"], 52), (["XZabc", "XYZdefg", "XYhijkl"], 50)],
+    # cSpell:enable
+)
+def test_badge_mask(group: list[str], priority: int):  # noqa: D103
+    assert_that(badge_mask(group).bit_length()).is_equal_to(priority)
+
+
+@pytest.mark.parametrize(
+    "group",
+    # cSpell:disable
+    [["abc", "def", "ghi"], ["abc", "abd", "abe"], ["abc", "abc"]],
+    # cSpell:enable
+)
+def test_badge_mask_invalid(group: list[str]):  # noqa: D103
+    with pytest.raises(ValueError):
+        badge_mask(group)
+
+
+@pytest.mark.parametrize("part, expected", [(1, 157), (2, 70)])
+def test_compute_total_priorities_bitmask(part: int, expected: int):  # noqa: D103
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        rucksacks = rucksack_list.read()
+        total = compute_total_priorities(rucksacks, part=part, backend="bitmask")
+
+        assert_that(total).is_equal_to(expected)
+
+
+def test_misplaced_priorities_array():  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        priorities = misplaced_priorities_array(rucksack_list.read())
+
+        assert_that(priorities.tolist()).is_equal_to([16, 38, 42, 22, 20, 19])
+
+
+def test_badges_priorities_array():  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "rucksack_contents_sample.data", "rb") as rucksack_list:
+        priorities = badges_priorities_array(rucksack_list.read())
+
+        assert_that(priorities.tolist()).is_equal_to([18, 52])
+
+
+@pytest.mark.parametrize("backend", ["set", "bitmask", "numpy"])
+def test_all_priorities_backends(backend: str):  # noqa: D103
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+
+    rucksacks = (TEST_DIR / "rucksack_contents_sample.data").read_text()
+
+    assert_that(all_misplaced_priorities(rucksacks, backend)).is_equal_to(
+        [16, 38, 42, 22, 20, 19]
+    )
+    assert_that(all_badges_priorities(rucksacks.splitlines(), backend)).is_equal_to(
+        [18, 52]
+    )
+
+
+@pytest.mark.parametrize(
+    "rucksack_list",
+    # cSpell:disable
+    ["abca\nabcdef", "abca\nabcabc", "abca\nabc", "abca\n\nabca", "ab1a\nabca"],
+    # cSpell:enable
+)
+def test_misplaced_priorities_array_invalid(rucksack_list: str):  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        misplaced_priorities_array(rucksack_list)
+
+
+@pytest.mark.parametrize(
+    "rucksack_list",
+    # cSpell:disable
+    ["abc\ndef\nghi", "abc\nabd\nabe", "Zabc\ndeZfg"],
+    # cSpell:enable
+)
+def test_badges_priorities_array_invalid(rucksack_list: str):  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        badges_priorities_array(rucksack_list)
+
+
+@pytest.mark.parametrize("part, expected", [(1, 157), (2, 70)])
+def test_compute_total_priorities_numpy(part: int, expected: int):  # noqa: D103
+    pytest.importorskip("numpy")
+
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        rucksacks = rucksack_list.read()
+        total = compute_total_priorities(rucksacks, part=part, backend="numpy")
+
+        assert_that(total).is_equal_to(expected)
+
+
+def test_compute_both_priorities():  # noqa: D103
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        totals = compute_both_priorities(rucksack_list.read())
+
+        assert_that(totals).is_equal_to((157, 70))
+
+
+def test_compute_both_priorities_file():  # noqa: D103
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        totals = compute_both_priorities(rucksack_list)
+
+        assert_that(totals).is_equal_to((157, 70))
+
+
+@pytest.mark.parametrize(
+    "rucksack_list",
+    # cSpell:disable
+    ["abcdef", "abca\nZzaZ", "aXaY\naXaY\naXaY", "aXbX\ncYdY\neXfX"],
+    # cSpell:enable
+)
+def test_compute_both_priorities_invalid(rucksack_list: str):  # noqa: D103
+    with pytest.raises(ValueError):
+        compute_both_priorities(rucksack_list)
+
+
+@pytest.mark.parametrize("part, expected", [(1, 157), (2, 70)])
+def test_compute_total_priorities_trusted(part: int, expected: int):  # noqa: D103
+    with open(TEST_DIR / "rucksack_contents_sample.data") as rucksack_list:
+        rucksacks = rucksack_list.read()
+
+    with validation_mode(TRUSTED):
+        total = compute_total_priorities(rucksacks, part=part)
+
+    assert_that(total).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "rucksack_list, part",
+    # cSpell:disable
+    [("", 1), ("abca\n", 1), ("abca\n\nabca", 1), ("ab1a", 1), ("abca\nabca", 2)],
+    # cSpell:enable
+)
+def test_check_rucksack_list(rucksack_list: str, part: int):  # noqa: D103
+    with pytest.raises(ValueError):
+        check_rucksack_list(rucksack_list, part)
+
+    with pytest.raises(ValueError), validation_mode(TRUSTED):
+        compute_total_priorities(rucksack_list, part)
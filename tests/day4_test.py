@@ -1,11 +1,25 @@
 """Tests for day 4 puzzle."""
 
+from array import array
 from pathlib import Path
 
 import pytest
 from assertpy import assert_that
 
-from pymaoc2022.day04 import WorkRange, is_overlapped, nb_overlap, parse_line
+from pymaoc2022.day04 import (
+    OverlapCounts,
+    SectionIndex,
+    WorkRange,
+    WorkRangeBatch,
+    check_assignments_list,
+    count_overlaps,
+    is_overlapped,
+    iter_assignments,
+    nb_overlap,
+    parse_line,
+)
+from pymaoc2022.records import mapped_input
+from pymaoc2022.validation import TRUSTED, validation_mode
 
 TEST_DIR = Path(__file__).parent
 
@@ -62,3 +76,216 @@ def test_nb_overlap():  # noqa: D103
         overlaps = nb_overlap(assignments)
 
         assert_that(overlaps).is_equal_to(2)
+
+
+def test_nb_overlap_trusted():  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        assignments = assignments_list.read()
+
+    with validation_mode(TRUSTED):
+        overlaps = nb_overlap(assignments)
+
+    assert_that(overlaps).is_equal_to(2)
+
+
+@pytest.mark.parametrize(
+    "assignments", ["", "2-4,6-8\n", "2-4,6-8\n\n2-3,4-5", "2-4;6-8", "2-a,6-8"]
+)
+def test_check_assignments_list(assignments: str):  # noqa: D103
+    with pytest.raises(ValueError):
+        check_assignments_list(assignments)
+
+    with pytest.raises(ValueError), validation_mode(TRUSTED):
+        nb_overlap(assignments)
+
+
+def test_work_range_trusted():  # noqa: D103
+    with pytest.raises(ValueError):
+        WorkRange(6, 4)
+
+    with validation_mode(TRUSTED):
+        assert_that(WorkRange(6, 4).stop).is_equal_to(4)
+
+
+def test_work_range_batch_from_str():  # noqa: D103
+    batch = WorkRangeBatch.from_str("2-4,6-8\n2-3,4-5\n15-17,7-9")
+
+    assert_that(batch).is_length(3)
+    assert_that(batch.start1.tolist()).is_equal_to([2, 2, 15])
+    assert_that(batch.stop1.tolist()).is_equal_to([4, 3, 17])
+    assert_that(batch.start2.tolist()).is_equal_to([6, 4, 7])
+    assert_that(batch.stop2.tolist()).is_equal_to([8, 5, 9])
+
+
+def test_work_range_batch_from_buffer():  # noqa: D103
+    text = (TEST_DIR / "pair_assignments_sample.data").read_text()
+    expected = WorkRangeBatch.from_str(text)
+
+    assert_that(WorkRangeBatch.from_str(text.encode())).is_equal_to(expected)
+    with mapped_input(TEST_DIR / "pair_assignments_sample.data") as buffer:
+        assert_that(WorkRangeBatch.from_str(buffer)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "assignments_list", ["2-4,6-8\n2-3,4-4294967296", "2-4,6-8\n-2-3,4-5"]
+)
+def test_work_range_batch_from_str_invalid(assignments_list: str):  # noqa: D103
+    assert_that(WorkRangeBatch.from_str).raises(ValueError).when_called_with(
+        assignments_list
+    )
+    assert_that(WorkRangeBatch.from_str).raises(ValueError).when_called_with(
+        assignments_list.encode()
+    )
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [([1, 2], [3], [1, 2], [3, 4]), ([1, 5], [3, 4], [1, 2], [3, 4])],
+)
+def test_work_range_batch_invalid(  # noqa: D103
+    columns: tuple[list[int], list[int], list[int], list[int]]
+):
+    with pytest.raises(ValueError):
+        WorkRangeBatch(*(array("I", column) for column in columns))
+
+
+def test_work_range_batch_predicates():  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        batch = WorkRangeBatch.from_str(assignments_list.read())
+
+    assert_that(list(batch.fully_contains())).is_equal_to(
+        [False, False, False, True, True, False]
+    )
+    assert_that(list(batch.overlaps())).is_equal_to(
+        [False, False, True, True, True, True]
+    )
+
+
+def test_nb_overlap_batch():  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        batch = WorkRangeBatch.from_str(assignments_list.read())
+
+    assert_that(nb_overlap(batch)).is_equal_to(2)
+
+
+@pytest.mark.parametrize("encode", [False, True])
+def test_iter_assignments(encode: bool):  # noqa: D103 FBT001
+    assignments = "2-4,6-8\n2-3,4-5\n15-17,7-9"
+    if encode:
+        assignments = assignments.encode()
+
+    assert_that(list(iter_assignments(assignments))).is_equal_to(
+        [(2, 4, 6, 8), (2, 3, 4, 5), (15, 17, 7, 9)]
+    )
+
+
+@pytest.mark.parametrize(
+    "assignments",
+    [
+        "",
+        "2-4,6-8\n",
+        "x2-4,6-8",
+        "2-4,6-8x\n2-3,4-5",
+        "2-4,6-8\n\n2-3,4-5",
+        "4-2,6-8",
+        "2-4,6-8;2-3,4-5",
+        "2-4,6-8\n2-8,3-7X2-8,3-7",
+    ],
+)
+def test_iter_assignments_invalid(assignments: str):  # noqa: D103
+    with pytest.raises(ValueError):
+        list(iter_assignments(assignments))
+
+
+def test_nb_overlap_bytes_invalid_separator():  # noqa: D103
+    assert_that(nb_overlap).raises(ValueError).when_called_with(b"2-8,3-7X2-8,3-7")
+
+
+def test_nb_overlap_bytes():  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data", "rb") as assignments_list:
+        assignments = assignments_list.read()
+
+    assert_that(nb_overlap(assignments)).is_equal_to(2)
+
+
+@pytest.fixture
+def section_index() -> SectionIndex:  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        return SectionIndex.from_str(assignments_list.read())
+
+
+def test_section_index_from_pairs(section_index: SectionIndex):  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        pairs = [parse_line(line) for line in assignments_list.read().split("\n")]
+
+    assert_that(SectionIndex.from_pairs(pairs)).is_equal_to(section_index)
+
+
+def test_section_index_overlap_counts(section_index: SectionIndex):  # noqa: D103
+    assert_that(section_index).is_length(6)
+    assert_that(section_index.nb_full).is_equal_to(2)
+    assert_that(section_index.nb_partial).is_equal_to(2)
+    assert_that(section_index.nb_disjoint).is_equal_to(2)
+
+
+@pytest.mark.parametrize(
+    "section, nb_elves, pairs",
+    [
+        (1, 0, []),
+        (2, 4, [0, 1, 3, 5]),
+        (4, 7, [0, 1, 3, 4, 5]),
+        (6, 8, [0, 2, 3, 4, 5]),
+        (9, 1, [2]),
+        (10, 0, []),
+    ],
+)
+def test_section_index_section(  # noqa: D103
+    section_index: SectionIndex, section: int, nb_elves: int, pairs: list[int]
+):
+    assert_that(section_index.nb_elves(section)).is_equal_to(nb_elves)
+    assert_that(section_index.pairs_at(section)).is_equal_to(pairs)
+
+
+@pytest.mark.parametrize(
+    "first, last, nb_elves", [(0, 1, 0), (1, 2, 4), (8, 9, 4), (1, 9, 12), (9, 20, 1)]
+)
+def test_section_index_nb_elves_between(  # noqa: D103
+    section_index: SectionIndex, first: int, last: int, nb_elves: int
+):
+    assert_that(section_index.nb_elves_between(first, last)).is_equal_to(nb_elves)
+
+
+def test_section_index_most_crowded(section_index: SectionIndex):  # noqa: D103
+    assert_that(section_index.most_crowded()).is_equal_to((6, 8))
+    # Found while building the index, not by scanning the coverage on each call
+    assert_that((section_index.crowded, section_index.crowd)).is_equal_to((6, 8))
+
+
+def test_section_index_empty():  # noqa: D103
+    index = SectionIndex.from_bounds([])
+
+    assert_that(index.nb_elves(4)).is_equal_to(0)
+    with pytest.raises(ValueError):
+        index.most_crowded()
+
+
+def test_count_overlaps():  # noqa: D103
+    with open(TEST_DIR / "pair_assignments_sample.data") as assignments_list:
+        counts = count_overlaps(assignments_list.read())
+
+    assert_that(counts).is_equal_to(OverlapCounts(full=2, partial=2, disjoint=2))
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("2-4,6-8", OverlapCounts(0, 0, 1)),
+        ("5-7,7-9", OverlapCounts(0, 1, 0)),
+        ("6-6,4-6", OverlapCounts(1, 0, 0)),
+        ("4-6,4-6", OverlapCounts(1, 0, 0)),
+        ("7-9,5-7", OverlapCounts(0, 1, 0)),
+        ("6-8,2-4", OverlapCounts(0, 0, 1)),
+    ],
+)
+def test_count_overlaps_line(line: str, expected: OverlapCounts):  # noqa: D103
+    assert_that(count_overlaps(line)).is_equal_to(expected)
@@ -0,0 +1,88 @@
+"""Tests for the puzzle input generators."""
+
+import json
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022 import generators
+from pymaoc2022.day01 import most_calorie_elf, most_calorie_elves
+from pymaoc2022.day02 import compute_both_scores
+from pymaoc2022.day03 import compute_both_priorities
+from pymaoc2022.day04 import count_overlaps
+from pymaoc2022.generators import FORMATS, generate_text, main, write_input
+
+
+@pytest.mark.parametrize("day", list(FORMATS))
+def test_generate_is_deterministic(day: str):  # noqa: D103
+    assert_that(generate_text(day, 50, seed=1)).is_equal_to(
+        generate_text(day, 50, seed=1)
+    )
+    assert_that(generate_text(day, 50, seed=1)).is_not_equal_to(
+        generate_text(day, 50, seed=2)
+    )
+
+
+@pytest.mark.parametrize("day", list(FORMATS))
+def test_write_input_matches_generate_text(day: str, tmp_path: Path):  # noqa: D103
+    write_input(day, tmp_path / "input.data", 50, seed=1)
+
+    assert_that((tmp_path / "input.data").read_text()).is_equal_to(
+        generate_text(day, 50, seed=1)
+    )
+
+
+def test_calorie_list_answers(tmp_path: Path):  # noqa: D103
+    answers = write_input("day01", tmp_path / "input.data", 500)
+    calorie_list = (tmp_path / "input.data").read_text()
+
+    assert_that(answers["part1"]).is_equal_to(list(most_calorie_elf(calorie_list)))
+    assert_that(answers["part2"]).is_equal_to(
+        [list(pkg) for pkg in most_calorie_elves(calorie_list)[:3]]
+    )
+
+
+def test_strategy_guide_answers(tmp_path: Path):  # noqa: D103
+    answers = write_input("day02", tmp_path / "input.data", 500)
+    round_list = (tmp_path / "input.data").read_text()
+
+    assert_that((answers["part1"], answers["part2"])).is_equal_to(
+        compute_both_scores(round_list)
+    )
+
+
+def test_strategy_guide_chunks(monkeypatch: pytest.MonkeyPatch):  # noqa: D103
+    expected = generate_text("day02", 50, seed=1)
+    monkeypatch.setattr(generators, "DRAW_CHUNK", 7)
+
+    assert_that(generate_text("day02", 50, seed=1)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize("size", [3, 500, 501])
+def test_rucksack_list_answers(tmp_path: Path, size: int):  # noqa: D103
+    answers = write_input("day03", tmp_path / "input.data", size)
+    rucksack_list = (tmp_path / "input.data").read_text()
+
+    assert_that((answers["part1"], answers["part2"])).is_equal_to(
+        compute_both_priorities(rucksack_list)
+    )
+
+
+def test_assignments_list_answers(tmp_path: Path):  # noqa: D103
+    answers = write_input("day04", tmp_path / "input.data", 500)
+    counts = count_overlaps((tmp_path / "input.data").read_text())
+
+    assert_that(answers).is_equal_to(
+        {"part1": counts.full, "partial": counts.partial, "disjoint": counts.disjoint}
+    )
+
+
+def test_main(tmp_path: Path):  # noqa: D103
+    output = tmp_path / "input.data"
+    expected = tmp_path / "expected.json"
+
+    main(["day02", str(output), "--size", "10", "--expected", str(expected)])
+
+    assert_that(output.read_text().count("\n")).is_equal_to(9)
+    assert_that(json.loads(expected.read_text())).contains_key("part1", "part2")
@@ -0,0 +1,108 @@
+"""Tests for the per stage instrumentation."""
+
+import pstats
+from pathlib import Path
+
+from assertpy import assert_that
+
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.instrumentation import get_recorder, instrumentation, stage
+from pymaoc2022.validation import TRUSTED, validation_mode
+
+SAMPLES = Path(__file__).parent
+
+
+def test_off_by_default():  # noqa: D103
+    assert_that(get_recorder()).is_none()
+    with stage("day02", "parse"):
+        pass
+    assert_that(stage("day02", "parse")).is_same_as(stage("day03", "compute"))
+
+
+def test_instrumentation_records_stages():  # noqa: D103
+    round_list = (SAMPLES / "strategy_guide_sample.data").read_text()
+
+    with instrumentation() as recorder:
+        assert_that(get_recorder()).is_same_as(recorder)
+        for _ in range(3):
+            day02.solve(round_list, part=1)
+
+    assert_that(get_recorder()).is_none()
+    stages = recorder.to_dict()["stages"]
+    assert_that(stages).contains_only("day02.parse", "day02.compute")
+    assert_that(stages["day02.parse"]["calls"]).is_equal_to(3)
+    assert_that(stages["day02.compute"]["seconds"]).is_positive()
+
+
+def test_every_day_is_instrumented():  # noqa: D103
+    inputs = {
+        day01: "calories_list_sample.data",
+        day02: "strategy_guide_sample.data",
+        day03: "rucksack_contents_sample.data",
+        day04: "pair_assignments_sample.data",
+    }
+
+    with instrumentation() as recorder:
+        for module, sample in inputs.items():
+            module.solve((SAMPLES / sample).read_text())
+        with validation_mode(TRUSTED):
+            day03.solve((SAMPLES / inputs[day03]).read_text())
+
+    assert_that(recorder.stages).contains(
+        "day01.parse",
+        "day01.compute",
+        "day02.parse",
+        "day02.compute",
+        "day03.parse",
+        "day03.compute",
+        "day04.compute",
+    )
+
+
+def test_lazy_inputs_have_no_parse_stage():  # noqa: D103
+    calorie_list = (SAMPLES / "calories_list_sample.data").read_text()
+    round_list = (SAMPLES / "strategy_guide_sample.data").read_text()
+
+    with instrumentation() as recorder:
+        day01.solve(calorie_list.encode())
+        day01.solve(calorie_list.splitlines())
+        day02.solve(round_list.encode())
+        day02.solve(round_list.splitlines())
+
+    assert_that(recorder.stages).contains_only("day01.compute", "day02.compute")
+
+
+def test_memory_of_nested_stages():  # noqa: D103
+    with instrumentation(memory=True) as recorder:
+        with stage("test", "compute"):
+            with stage("test", "parse"):
+                data = [bytearray(1000) for _ in range(100)]
+            del data
+
+    stages = recorder.to_dict()["stages"]
+    assert_that(stages["test.parse"]["allocated"]).is_greater_than(100_000)
+    assert_that(stages["test.compute"]["allocated"]).is_greater_than_or_equal_to(
+        stages["test.parse"]["allocated"]
+    )
+
+
+def test_profile_dump(tmp_path: Path):  # noqa: D103
+    round_list = (SAMPLES / "strategy_guide_sample.data").read_text()
+
+    with instrumentation(profile_dir=tmp_path) as recorder:
+        day02.compute_both_scores(round_list)
+
+    assert_that(recorder.profiles).is_length(2)
+    stats = pstats.Stats(str(tmp_path / "day02.parse-0001.pstats"))
+    assert_that([function for _, _, function in stats.stats]).contains(
+        "round_histogram"
+    )
+
+
+def test_save(tmp_path: Path):  # noqa: D103
+    with instrumentation() as recorder, stage("test", "read"):
+        pass
+
+    recorder.save(tmp_path / "stages.json")
+
+    assert_that((tmp_path / "stages.json").read_text()).contains('"test.read"')
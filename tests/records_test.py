@@ -0,0 +1,263 @@
+"""Tests for the streaming record reader."""
+
+import io
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.generators import generate_text
+from pymaoc2022.records import (
+    GROUP_SEP,
+    LINE_SEP,
+    iter_buffer_records,
+    iter_chunks,
+    iter_lines,
+    iter_records,
+    mapped_input,
+)
+from pymaoc2022.validation import STRICT, TRUSTED, validation_mode
+
+SAMPLES = Path(__file__).parent
+
+# cSpell:disable
+TEXTS = [
+    "",
+    "A Y",
+    "A Y\n",
+    "A Y\nB X\nC Z",
+    "1000\n2000\n\n3000\n\n4000\n",
+    "vJrwpWtwJgWrhcsFMMfFFhFp\n\n\njqHRNqRjqzjGDLGL\n\n",
+    "é\nàb\n\nç",
+    "A Y\n\n\n",
+    "\n\nA Y",
+]
+# cSpell:enable
+
+SAMPLE_FILES = [
+    (day01, "calories_list_sample.data", LINE_SEP),
+    (day02, "strategy_guide_sample.data", LINE_SEP),
+    (day03, "rucksack_contents_sample.data", LINE_SEP),
+    (day04, "pair_assignments_sample.data", LINE_SEP),
+]
+
+
+def _sources(text: str, chunk_size: int) -> list:
+    data = text.encode()
+    return [
+        data,
+        bytearray(data),
+        io.StringIO(text),
+        io.BytesIO(data),
+        [text[idx : idx + chunk_size] for idx in range(0, len(text), chunk_size)],
+        [data[idx : idx + chunk_size] for idx in range(0, len(data), chunk_size)],
+    ]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("sep", [LINE_SEP, GROUP_SEP])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1024])
+def test_iter_records(text: str, sep: str, chunk_size: int):  # noqa: D103
+    expected = text.rstrip("\n").split(sep) if text.rstrip("\n") else []
+
+    for source in _sources(text, chunk_size):
+        assert_that(list(iter_records(source, sep, chunk_size))).is_equal_to(expected)
+
+
+def test_iter_records_from_path(tmp_path: Path):  # noqa: D103
+    (tmp_path / "input.data").write_text("1000\n2000\n\n3000\n")
+
+    assert_that(list(iter_records(tmp_path / "input.data", GROUP_SEP, 4))).is_equal_to(
+        ["1000\n2000", "3000"]
+    )
+
+
+def test_iter_records_from_str_path(tmp_path: Path):  # noqa: D103
+    (tmp_path / "input.data").write_text("1000\n2000\n\n3000\n")
+
+    assert_that(
+        list(iter_records(str(tmp_path / "input.data"), GROUP_SEP, 4))
+    ).is_equal_to(["1000\n2000", "3000"])
+    assert_that(next).raises(FileNotFoundError).when_called_with(
+        iter_records(str(tmp_path / "missing.data"))
+    )
+
+
+def test_iter_chunks_is_bounded():  # noqa: D103
+    chunks = list(iter_chunks(io.BytesIO(b"x" * 10), chunk_size=4))
+
+    assert_that([len(chunk) for chunk in chunks]).is_equal_to([4, 4, 2])
+
+
+@pytest.mark.parametrize(("module", "sample", "sep"), SAMPLE_FILES)
+def test_solvers_accept_records(  # noqa: D103
+    module: ModuleType, sample: str, sep: str
+):
+    for part in module.PARTS:
+        assert_that(
+            module.solve(iter_records(SAMPLES / sample, sep, chunk_size=7), part)
+        ).is_equal_to(module.solve((SAMPLES / sample).read_text(), part))
+
+
+@pytest.mark.parametrize(("module", "sample", "sep"), SAMPLE_FILES)
+@pytest.mark.parametrize("mode", ["r", "rb"])
+def test_solvers_accept_file_objects(  # noqa: D103
+    module: ModuleType, sample: str, sep: str, mode: str
+):
+    for part in module.PARTS:
+        with open(SAMPLES / sample, mode) as input_f:
+            assert_that(module.solve(input_f, part)).is_equal_to(
+                module.solve((SAMPLES / sample).read_text(), part)
+            )
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [["A Y\n", "B X\n", "C Z"], [b"A Y\n", b"B X\n", b"C Z\n"], ["A Y", "B X", "C Z"]],
+)
+def test_iter_lines(lines: list):  # noqa: D103
+    assert_that(list(iter_lines(lines))).is_equal_to(["A Y", "B X", "C Z"])
+
+
+def test_iter_lines_of_records():  # noqa: D103
+    assert_that(list).raises(ValueError).when_called_with(
+        iter_lines(["1000\n2000", "3000"])
+    )
+
+
+def test_streamed_solvers():  # noqa: D103
+    assert_that(
+        day01.most_calorie_elves(iter_records(SAMPLES / "calories_list_sample.data"))
+    ).is_equal_to(
+        day01.most_calorie_elves((SAMPLES / "calories_list_sample.data").read_text())
+    )
+    assert_that(
+        day02.compute_both_scores(iter_records(SAMPLES / "strategy_guide_sample.data"))
+    ).is_equal_to((15, 12))
+    assert_that(
+        day03.compute_total_priorities(
+            iter_records(SAMPLES / "rucksack_contents_sample.data"), part=2
+        )
+    ).is_equal_to(70)
+    assert_that(
+        day04.count_overlaps(iter_records(SAMPLES / "pair_assignments_sample.data"))
+    ).is_equal_to((2, 2, 2))
+
+
+def test_malformed_assignment_record():  # noqa: D103
+    assert_that(day04.nb_overlap).raises(ValueError).when_called_with(
+        iter_records(io.StringIO("2-4,6-8\n2-4;6-8"))
+    )
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("sep", [LINE_SEP, GROUP_SEP])
+def test_iter_buffer_records(text: str, sep: str):  # noqa: D103
+    expected = list(iter_records(io.StringIO(text), sep))
+
+    for buffer in (text.encode(), bytearray(text.encode())):
+        assert_that(
+            [record.decode() for record in iter_buffer_records(buffer, sep)]
+        ).is_equal_to(expected)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("sep", [LINE_SEP, GROUP_SEP])
+def test_iter_mapped_records(tmp_path: Path, text: str, sep: str):  # noqa: D103
+    (tmp_path / "input.data").write_text(text)
+
+    with mapped_input(tmp_path / "input.data") as buffer:
+        records = [record.decode() for record in iter_buffer_records(buffer, sep)]
+
+    assert_that(records).is_equal_to(list(iter_records(io.StringIO(text), sep)))
+
+
+def test_mapped_input_is_read_only(tmp_path: Path):  # noqa: D103
+    (tmp_path / "input.data").write_text("A Y\n")
+
+    with mapped_input(tmp_path / "input.data") as buffer:
+        assert_that(buffer[:]).is_equal_to(b"A Y\n")
+        with pytest.raises(TypeError):
+            buffer[0] = ord("B")
+
+
+@pytest.mark.parametrize(("module", "sample", "sep"), SAMPLE_FILES)
+@pytest.mark.parametrize("mode", [STRICT, TRUSTED])
+def test_solvers_accept_mapped_input(  # noqa: D103
+    module: ModuleType, sample: str, sep: str, mode: str
+):
+    with validation_mode(mode), mapped_input(SAMPLES / sample) as buffer:
+        for part in module.PARTS:
+            assert_that(module.solve(buffer, part)).is_equal_to(
+                module.solve((SAMPLES / sample).read_text(), part)
+            )
+
+
+def test_mapped_empty_input(tmp_path: Path):  # noqa: D103
+    (tmp_path / "input.data").write_text("")
+
+    with mapped_input(tmp_path / "input.data") as buffer:
+        assert_that(buffer).is_equal_to(b"")
+        assert_that(list(iter_buffer_records(buffer))).is_empty()
+
+
+def test_mapped_solvers(tmp_path: Path):  # noqa: D103
+    for day in ("day01", "day02", "day03", "day04"):
+        (tmp_path / day).write_text(generate_text(day, 3000))
+
+    with mapped_input(tmp_path / "day01") as buffer:
+        assert_that(day01.most_calorie_elves(buffer)).is_equal_to(
+            day01.most_calorie_elves((tmp_path / "day01").read_text())
+        )
+    with mapped_input(tmp_path / "day02") as buffer:
+        assert_that(day02.compute_global_score(buffer, part=2)).is_equal_to(
+            day02.compute_global_score((tmp_path / "day02").read_text(), part=2)
+        )
+    with mapped_input(tmp_path / "day03") as buffer:
+        assert_that(day03.compute_total_priorities(buffer, part=2)).is_equal_to(
+            day03.compute_total_priorities((tmp_path / "day03").read_text(), part=2)
+        )
+    with mapped_input(tmp_path / "day04") as buffer:
+        assert_that(day04.nb_overlap(buffer)).is_equal_to(
+            day04.nb_overlap((tmp_path / "day04").read_text())
+        )
+
+
+@pytest.mark.parametrize(("module", "sample", "sep"), SAMPLE_FILES)
+@pytest.mark.parametrize("mode", [STRICT, TRUSTED])
+def test_mapped_input_ending_with_newline(  # noqa: D103
+    tmp_path: Path, module: ModuleType, sample: str, sep: str, mode: str
+):
+    text = (SAMPLES / sample).read_text()
+    (tmp_path / "input.data").write_text(text + "\n")
+
+    with validation_mode(mode), mapped_input(tmp_path / "input.data") as buffer:
+        for part in module.PARTS:
+            assert_that(module.solve(buffer, part)).is_equal_to(
+                module.solve(text, part)
+            )
+
+
+@pytest.mark.parametrize("part", [1, 2])
+def test_mapped_input_ending_with_newline_numpy(  # noqa: D103
+    tmp_path: Path, part: int
+):
+    pytest.importorskip("numpy")
+    text = (SAMPLES / "rucksack_contents_sample.data").read_text()
+    (tmp_path / "input.data").write_text(text + "\n\n")
+
+    with mapped_input(tmp_path / "input.data") as buffer:
+        assert_that(
+            day03.compute_total_priorities(buffer, part, backend="numpy")
+        ).is_equal_to(day03.compute_total_priorities(text, part))
+
+
+def test_mapped_input_numpy_error(tmp_path: Path):  # noqa: D103
+    pytest.importorskip("numpy")
+    (tmp_path / "input.data").write_text("ab\n1b\nab\n")
+
+    # The map is closed cleanly, the error of the solver is not hidden
+    with pytest.raises(ValueError), mapped_input(tmp_path / "input.data") as buffer:
+        day03.compute_total_priorities(buffer, backend="numpy")
@@ -0,0 +1,165 @@
+"""Tests for the sharded parallel solver."""
+
+import json
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022 import day01, day02, day03, day04
+from pymaoc2022.generators import write_input
+from pymaoc2022.records import mapped_input
+from pymaoc2022.sharding import (
+    MAX_SHARD_SIZE,
+    MIN_SHARD_SIZE,
+    count_records,
+    default_shard_size,
+    main,
+    record_start,
+    regroup_bounds,
+    shard_bounds,
+    shard_partial,
+    skip_records,
+    solve_sharded,
+)
+from pymaoc2022.validation import STRICT, TRUSTED, validation_mode
+
+SAMPLES = Path(__file__).parent
+DAYS = [day01, day02, day03, day04]
+
+
+def _expected(module: ModuleType, path: Path) -> dict:
+    with mapped_input(path) as buffer:
+        return {f"part{part}": module.solve(buffer, part) for part in module.PARTS}
+
+
+@pytest.mark.parametrize(
+    ("offset", "expected"),
+    [(0, 0), (1, 3), (3, 3), (4, 6), (7, 8), (8, 8)],
+)
+def test_record_start(offset: int, expected: int):  # noqa: D103
+    assert_that(record_start(b"ab\ncd\nef", b"\n", offset)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(("offset", "expected"), [(1, 3), (3, 3), (5, 3), (6, 6)])
+def test_record_start_in_separator_run(offset: int, expected: int):  # noqa: D103
+    # The first blank line ends the Elf, the next ones start empty Elves
+    assert_that(record_start(b"1\n\n\n\n2", b"\n\n", offset)).is_equal_to(expected)
+
+
+def test_skip_records():  # noqa: D103
+    buffer = b"a\nb\nc\nd"
+
+    assert_that(skip_records(buffer, b"\n", 2, 0)).is_equal_to(2)
+    assert_that(skip_records(buffer, b"\n", 2, 2)).is_equal_to(6)
+    assert_that(skip_records(buffer, b"\n", 2, 5)).is_equal_to(len(buffer))
+
+
+def test_shard_bounds():  # noqa: D103
+    buffer = b"aaa\nbb\ncccc\nd\n"
+
+    assert_that(shard_bounds(buffer, b"\n", 5)).is_equal_to([(0, 7), (7, 12), (12, 14)])
+    assert_that(shard_bounds(buffer, b"\n", 100)).is_equal_to([(0, 14)])
+    assert_that(shard_bounds(b"", b"\n", 5)).is_empty()
+
+
+def test_shard_bounds_of_range():  # noqa: D103
+    buffer = b"aaa\nbb\ncccc\nd\n"
+
+    assert_that(shard_bounds(buffer, b"\n", 3, start=4, stop=12)).is_equal_to(
+        [(4, 7), (7, 12)]
+    )
+    assert_that(shard_bounds(buffer, b"\n", 3, start=7, stop=7)).is_empty()
+
+
+def test_count_records():  # noqa: D103
+    assert_that(count_records(b"a\nb\n\nc", b"\n", 0, 6)).is_equal_to(3)
+    assert_that(count_records(b"a\nb\n\nc", b"\n", 2, 4)).is_equal_to(1)
+
+
+def test_shard_partial():  # noqa: D103
+    buffer = b"1-2,3-4\n2-8,3-7\n\n"
+
+    assert_that(shard_partial("day04", buffer, 0, len(buffer))).is_equal_to((1, 0, 1))
+    assert_that(shard_partial("day04", buffer, 16, len(buffer))).is_equal_to((0, 0, 0))
+
+
+def test_regroup_bounds():  # noqa: D103
+    buffer = b"a\nb\nc\nd\ne\nf\ng\nh\ni"
+    bounds = shard_bounds(buffer, b"\n", 3)
+    counts = [buffer[start:stop].count(b"\n") for start, stop in bounds]
+
+    assert_that(regroup_bounds(buffer, b"\n", bounds, counts, 3)).is_equal_to(
+        [(0, 6), (6, 12), (12, 17)]
+    )
+
+
+@pytest.mark.parametrize(
+    ("size", "workers", "expected"),
+    [(0, 4, MIN_SHARD_SIZE), (1 << 30, 4, MAX_SHARD_SIZE), (64 << 20, 2, 8 << 20)],
+)
+def test_default_shard_size(size: int, workers: int, expected: int):  # noqa: D103
+    assert_that(default_shard_size(size, workers)).is_equal_to(expected)
+
+
+@pytest.mark.parametrize("module", DAYS)
+@pytest.mark.parametrize("shard_size", [1, 5, 64, 1000, 1 << 20])
+@pytest.mark.parametrize("mode", [STRICT, TRUSTED])
+def test_solve_sharded(  # noqa: D103
+    tmp_path: Path, module: ModuleType, shard_size: int, mode: str
+):
+    day = module.__name__.rpartition(".")[2]
+    path = tmp_path / f"{day}.data"
+    write_input(day, path, 300)
+
+    with validation_mode(mode):
+        result = solve_sharded(day, path, workers=1, shard_size=shard_size)
+
+    assert_that(result["answers"]).is_equal_to(_expected(module, path))
+
+
+def test_solve_sharded_ties(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "calories.data"
+    path.write_text("7\n\n5\n\n\n7\n\n3\n4\n\n7\n")
+
+    for shard_size in range(1, 20):
+        assert_that(
+            solve_sharded("day01", path, workers=1, shard_size=shard_size)["answers"]
+        ).is_equal_to(_expected(day01, path))
+
+
+def test_solve_sharded_in_processes(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "rucksacks.data"
+    write_input("day03", path, 600)
+
+    result = solve_sharded("day03", path, workers=2, shard_size=256)
+
+    assert_that(result["workers"]).is_equal_to(2)
+    assert_that(result["shards"]).is_greater_than(2)
+    assert_that(result["answers"]).is_equal_to(_expected(day03, path))
+
+
+def test_solve_sharded_invalid(tmp_path: Path):  # noqa: D103
+    path = tmp_path / "rucksacks.data"
+    # cSpell:disable
+    path.write_text("vJrwpWtwJgWrhcsFMMfFFhFp\njqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL\n")
+    # cSpell:enable
+
+    assert_that(solve_sharded).raises(ValueError).when_called_with(
+        "day03", path, workers=1
+    )
+    assert_that(solve_sharded).raises(ValueError).when_called_with(
+        "day42", path, workers=1
+    )
+
+
+def test_main(capsys: pytest.CaptureFixture):  # noqa: D103
+    status = main(
+        ["day02", str(SAMPLES / "strategy_guide_sample.data"), "--workers", "1"]
+    )
+
+    assert_that(status).is_zero()
+    assert_that(json.loads(capsys.readouterr().out)["answers"]).is_equal_to(
+        {"part1": 15, "part2": 12}
+    )
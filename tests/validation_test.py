@@ -0,0 +1,59 @@
+"""Tests for the validation mode switch."""
+
+import pytest
+from assertpy import assert_that
+
+from pymaoc2022.validation import (
+    ENV_VAR,
+    STRICT,
+    TRUSTED,
+    _environment_mode,
+    get_validation_mode,
+    is_trusted,
+    set_validation_mode,
+    validation_mode,
+)
+
+
+def test_default_mode():  # noqa: D103
+    assert_that(get_validation_mode()).is_equal_to(STRICT)
+    assert_that(is_trusted()).is_false()
+
+
+def test_environment_mode(monkeypatch: pytest.MonkeyPatch):  # noqa: D103
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    assert_that(_environment_mode()).is_equal_to(STRICT)
+
+    monkeypatch.setenv(ENV_VAR, TRUSTED)
+    assert_that(_environment_mode()).is_equal_to(TRUSTED)
+
+    monkeypatch.setenv(ENV_VAR, "Trusted")
+    assert_that(_environment_mode).raises(ValueError).when_called_with()
+
+
+def test_validation_mode():  # noqa: D103
+    with validation_mode(TRUSTED):
+        assert_that(is_trusted()).is_true()
+
+        with validation_mode(STRICT):
+            assert_that(is_trusted()).is_false()
+
+        assert_that(is_trusted()).is_true()
+
+    assert_that(is_trusted()).is_false()
+
+
+def test_set_validation_mode():  # noqa: D103
+    with validation_mode(STRICT):
+        set_validation_mode(TRUSTED)
+        assert_that(is_trusted()).is_true()
+
+    assert_that(is_trusted()).is_false()
+
+
+def test_unknown_mode():  # noqa: D103
+    with pytest.raises(ValueError), validation_mode("lenient"):
+        pass
+
+    with pytest.raises(ValueError):
+        set_validation_mode("lenient")